@@ -0,0 +1,227 @@
+# analysis_queue.py
+
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, List, Set, Tuple
+
+from instrumentation import metrics, record_failure, span
+from models import AnalysisStatus, Article
+
+BIAS_MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bias_models")
+
+# Number of worker processes running the bias_models pipeline; 0 disables analysis
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "1"))
+# Load the models when a worker starts instead of on its first article
+ANALYSIS_WARMUP = os.getenv("ANALYSIS_WARMUP", "0") == "1"
+# Most queued articles one worker analyzes at once, each on its own thread. With MICRO_BATCHING=1
+# their chunks share forward passes through bias_models' per-model micro-batchers.
+ANALYSIS_THREADS = int(os.getenv("ANALYSIS_THREADS", "8" if os.getenv("MICRO_BATCHING", "0") == "1" else "1"))
+
+# (article id, analysis input, when it was queued)
+Job = Tuple[uuid.UUID, str, float]
+
+
+def _init_worker(threads: int) -> None:
+    # bias_models uses flat imports and ./models/... paths relative to its own folder
+    sys.path.insert(0, BIAS_MODELS_DIR)
+    os.chdir(BIAS_MODELS_DIR)
+    # Spans recorded here are handed back with each result and counted in the API's /metrics
+    metrics.forward = True
+    # Threads would otherwise race to load the same models on the first group
+    if ANALYSIS_WARMUP or threads > 1:
+        from analysis import warmup
+
+        try:
+            warmup()
+        except Exception as e:
+            # A failing initializer would break the pool for good; load lazily instead
+            print(f"❌ Warm-up failed, models will load on first use: {e}")
+
+
+def _analyze(text: str) -> Tuple[dict | None, str | None]:
+    from analysis import analyze_text
+
+    try:
+        with span("analysis", chars=len(text)):
+            return analyze_text(text), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _run_analyses(texts: List[str]) -> Tuple[List[Tuple[dict | None, str | None]], List[dict]]:
+    """([(result, error), ...], spans) for `texts`, analyzed concurrently on this worker's threads.
+
+    Failures are returned, not raised, so the other texts' results and every span still reach the API.
+    """
+    if len(texts) == 1:
+        outcomes = [_analyze(texts[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+            outcomes = list(pool.map(_analyze, texts))
+    return outcomes, metrics.drain()
+
+
+def analysis_input(article: Article) -> str | None:
+    body = article.text or article.summary
+    return f"{article.title}\n\n{body}" if body else None
+
+
+class AnalysisQueue:
+    """Runs bias and sentiment analysis on a process pool and writes results to the store.
+
+    Models stay loaded inside each worker process, so only the first job per
+    worker pays for loading them. The pool is started on the first submission.
+    Each worker runs one job at a time. A job takes up to `threads` of the
+    articles waiting when the worker frees up, so a lone article starts at once
+    and a backlog is analyzed concurrently, sharing micro-batched forward passes.
+    """
+
+    def __init__(self, repository, workers: int = ANALYSIS_WORKERS, threads: int = ANALYSIS_THREADS):
+        self.repository = repository
+        self.workers = workers
+        self.threads = max(threads, 1)
+        self._executor: ProcessPoolExecutor | None = None
+        self._waiting: Deque[Job] = deque()
+        self._running = 0  # jobs handed to the pool, at most one per worker
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads (and maybe torch) is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.threads,),
+                )
+            return self._executor
+
+    def initial_status(self, article: Article) -> AnalysisStatus | None:
+        """Status to store `article` with, so it is recorded in the same write as the article itself."""
+        if not self.enabled:
+            return None
+        return "skipped" if analysis_input(article) is None else "pending"
+
+    def submit(self, article: Article) -> AnalysisStatus | None:
+        """Queues an article stored with initial_status() and returns its status (None when disabled).
+
+        Never raises: the article is already stored, so a queueing problem is recorded
+        as a failed analysis instead of failing the request that stored it.
+        """
+        if article.analysis_status != "pending":
+            return article.analysis_status
+        with self._lock:
+            self._waiting.append((article.id, analysis_input(article), time.perf_counter()))
+        return "failed" if article.id in self._dispatch() else "pending"
+
+    def resume(self) -> int:
+        """Re-queues articles a previous run left "pending" (queued or running when it stopped).
+
+        Their status is already stored, so they go straight to the waiting queue.
+        Returns how many were queued.
+        """
+        if not self.enabled:
+            return 0
+        try:
+            pending = self.repository.pending_analysis()
+        except Exception as e:
+            print(f"❌ Could not load articles pending analysis: {e}")
+            return 0
+        queued = time.perf_counter()
+        # Only articles with text are ever marked pending, and merges never remove it
+        jobs = [(article.id, analysis_input(article), queued) for article in pending]
+        with self._lock:
+            self._waiting.extend(jobs)
+        self._dispatch()
+        return len(jobs)
+
+    def _dispatch(self) -> Set[uuid.UUID]:
+        """Hands waiting articles to idle workers; returns the ids that could not be queued."""
+        failed: Set[uuid.UUID] = set()
+        while True:
+            with self._lock:
+                if not self._waiting or self._running >= self.workers:
+                    return failed
+                group = [self._waiting.popleft() for _ in range(min(self.threads, len(self._waiting)))]
+                self._running += 1
+            try:
+                self._submit(group)
+            except Exception as e:
+                with self._lock:
+                    self._running -= 1
+                for article_id, _, _ in group:
+                    print(f"❌ Could not queue analysis for article {article_id}: {e}")
+                    self._save_failure(article_id, f"{type(e).__name__}: {e}")
+                    failed.add(article_id)
+
+    def _submit(self, group: List[Job]) -> None:
+        texts = [text for _, text, _ in group]
+        executor = self._pool()
+        try:
+            future = executor.submit(_run_analyses, texts)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed while loading models); start a new pool and retry once
+            print("♻️ Analysis pool is broken, starting a new one")
+            self._discard(executor)
+            executor.shutdown(wait=False, cancel_futures=True)
+            executor = self._pool()
+            future = executor.submit(_run_analyses, texts)
+        future.add_done_callback(lambda done: self._on_done(group, executor, done))
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # The next submission builds a fresh pool
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def _on_done(self, group: List[Job], executor: ProcessPoolExecutor, future: Future) -> None:
+        with self._lock:
+            self._running -= 1
+        try:
+            outcomes, spans = future.result()
+        except Exception as e:
+            # The job never reported back (e.g. its worker died), so its failures are counted here,
+            # timed from when each article was queued
+            now = time.perf_counter()
+            for _, _, queued in group:
+                record_failure("analysis", e, now - queued)
+            if isinstance(e, BrokenProcessPool):
+                # Already shutting itself down; just stop handing it new jobs
+                self._discard(executor)
+            outcomes, spans = [(None, f"{type(e).__name__}: {e}")] * len(group), []
+        metrics.merge(spans)
+        for (article_id, _, _), (result, error) in zip(group, outcomes):
+            if error is not None:
+                print(f"❌ Analysis failed for article {article_id}: {error}")
+                self._save_failure(article_id, error)
+                continue
+            try:
+                self.repository.save_analysis(article_id, "done", result=result)
+            except Exception as e:
+                print(f"❌ Could not save analysis for article {article_id}: {e}")
+        self._dispatch()
+
+    def _save_failure(self, article_id: uuid.UUID, error: str) -> None:
+        try:
+            self.repository.save_analysis(article_id, "failed", error=error)
+        except Exception as e:
+            print(f"❌ Could not record failed analysis for article {article_id}: {e}")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._waiting.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,66 @@
+# bench_bias_batching.py
+#
+# Times analyze_bias-style inference one chunk at a time (the old behaviour) and
+# in length-sorted batches, and checks both give the same labels on a long article.
+# Needs the bias models downloaded under bias_models/models.
+#
+#   python benchmarks/bench_bias_batching.py --model distilbert --paragraphs 60
+
+import argparse
+import os
+import sys
+import time
+
+BIAS_MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bias_models")
+sys.path.insert(0, BIAS_MODELS_DIR)
+os.chdir(BIAS_MODELS_DIR)
+
+from chunker import chunk_text
+from inference import predict_proba
+from model_registry import BIAS_MODELS, registry
+
+PARAGRAPH = (
+    "Lawmakers returned to the capital on Monday to debate a spending bill that would expand "
+    "rural broadband, raise payments to veterans and trim the budget of several federal agencies. "
+    "Supporters said the package would create jobs and lower costs for families, while critics "
+    "argued that it added to the deficit and handed too much power to regulators. "
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched vs per-chunk bias inference")
+    parser.add_argument("--model", default="distilbert", choices=sorted(BIAS_MODELS))
+    parser.add_argument("--paragraphs", type=int, default=60)
+    parser.add_argument("--batch-sizes", default="4,8,16,32")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tokenizer, model = registry.get(args.model)
+
+    # Vary paragraph length a little so chunks are not all the same size
+    text = " ".join(PARAGRAPH * (1 + i % 3) for i in range(args.paragraphs))
+    chunks = chunk_text(text)
+    print(f"{args.model}: {len(chunks)} chunks")
+
+    def run(batch_size):
+        best, scores = float("inf"), None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            scores = predict_proba(tokenizer, model, chunks, batch_size=batch_size)
+            best = min(best, time.perf_counter() - start)
+        return best, scores
+
+    single, reference = run(1)
+    print(f"batch 1: {single * 1000:.0f} ms")
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        elapsed, scores = run(batch_size)
+        same = all(a.argmax() == b.argmax() for a, b in zip(reference, scores))
+        drift = max(abs(a - b).max() for a, b in zip(reference, scores))
+        print(
+            f"batch {batch_size}: {elapsed * 1000:.0f} ms ({single / elapsed:.2f}x), "
+            f"labels {'identical' if same else 'DIFFER'}, max score drift {drift:.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
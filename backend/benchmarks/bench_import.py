@@ -0,0 +1,80 @@
+# bench_import.py
+#
+# Cold-start cost of the analysis entry point: each run imports `analysis` in a
+# fresh interpreter (from bias_models/, like the API workers and the CLI), and
+# reports the median wall time plus the slowest modules from -X importtime.
+# Importing should not load any model; --warmup also times analysis.warmup().
+#
+#   python benchmarks/bench_import.py --repeat 5
+#   python benchmarks/bench_import.py --warmup --output import_times.json
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BIAS_MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bias_models")
+
+PROBE = """
+import time
+start = time.perf_counter()
+import analysis
+imported = time.perf_counter() - start
+warmup = None
+if {warmup}:
+    start = time.perf_counter()
+    analysis.warmup()
+    warmup = time.perf_counter() - start
+print("RESULT", imported, warmup)
+"""
+
+
+def run_once(warmup: bool):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(warmup=warmup)],
+        cwd=BIAS_MODELS_DIR, capture_output=True, text=True, check=True,
+    )
+    result = next(line for line in completed.stdout.splitlines() if line.startswith("RESULT"))
+    _, imported, warmed = result.split()
+    # importtime lines: "import time: self [us] | cumulative | imported package"
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules.append((int(self_us), name.strip()))
+    return float(imported), None if warmed == "None" else float(warmed), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of the analysis entry point")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", action="store_true", help="also time analysis.warmup()")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--output", help="write the numbers to this JSON file")
+    args = parser.parse_args()
+
+    runs = [run_once(args.warmup) for _ in range(args.repeat)]
+    import_ms = statistics.median(r[0] for r in runs) * 1000
+    print(f"import analysis: median {import_ms:.1f} ms over {args.repeat} runs")
+    results = {"repeat": args.repeat, "import_ms": round(import_ms, 1)}
+    if args.warmup:
+        warmup_ms = statistics.median(r[1] for r in runs) * 1000
+        print(f"analysis.warmup(): median {warmup_ms:.0f} ms")
+        results["warmup_ms"] = round(warmup_ms, 1)
+
+    slowest = sorted(runs[-1][2], reverse=True)[:args.top]
+    print("slowest modules (self time, last run):")
+    for self_us, name in slowest:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+    results["slowest_modules"] = [{"module": name, "self_ms": round(us / 1000, 1)} for us, name in slowest]
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# bench_micro_batching.py
+#
+# Concurrent callers each score a few chunks at a time, either calling the model
+# directly or through a MicroBatcher. Reports chunks/s and per-call latency.
+# By default the model is simulated (fixed cost per forward pass plus a cost per
+# chunk, one pass at a time like a CPU-bound model); --model runs a real bias model.
+#
+#   python benchmarks/bench_micro_batching.py --callers 1 16 --chunks-per-call 2
+#   python benchmarks/bench_micro_batching.py --model distilbert
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+BIAS_MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bias_models")
+sys.path.insert(0, BIAS_MODELS_DIR)
+os.chdir(BIAS_MODELS_DIR)
+
+from micro_batcher import MicroBatcher
+
+SAMPLE_CHUNK = (
+    "Lawmakers returned to the capital on Monday to debate a spending bill that would expand "
+    "rural broadband, raise payments to veterans and trim the budget of several federal agencies."
+)
+
+
+def simulated_model(pass_ms, chunk_ms):
+    lock = threading.Lock()
+
+    def predict(items):
+        with lock:
+            time.sleep((pass_ms + chunk_ms * len(items)) / 1000)
+        return [[1.0, 0.0, 0.0] for _ in items]
+
+    return predict
+
+
+def real_model(name):
+    from inference import predict_proba
+    from model_registry import registry
+
+    tokenizer, model = registry.get(name)
+    lock = threading.Lock()
+
+    def predict(items):
+        with lock:
+            return predict_proba(tokenizer, model, items)
+
+    return predict
+
+
+def run(call, callers, calls_per_caller, chunks_per_call):
+    latencies = []
+    lock = threading.Lock()
+
+    def caller():
+        for _ in range(calls_per_caller):
+            start = time.perf_counter()
+            call([SAMPLE_CHUNK] * chunks_per_call)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "chunks_per_s": callers * calls_per_caller * chunks_per_call / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched vs direct inference")
+    parser.add_argument("--model", help="registry bias model to run instead of the simulation")
+    parser.add_argument("--pass-ms", type=float, default=20.0, help="simulated cost of one forward pass")
+    parser.add_argument("--chunk-ms", type=float, default=2.0, help="simulated cost per chunk in a pass")
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--calls", type=int, default=20, help="calls per caller")
+    parser.add_argument("--chunks-per-call", type=int, default=2)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    predict = real_model(args.model) if args.model else simulated_model(args.pass_ms, args.chunk_ms)
+    print(f"model: {args.model or f'simulated ({args.pass_ms} ms/pass + {args.chunk_ms} ms/chunk)'}")
+    for callers in args.callers:
+        batcher = MicroBatcher(predict, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, name="bench")
+        for label, call in (("direct", predict), ("batched", batcher)):
+            result = run(call, callers, args.calls, args.chunks_per_call)
+            print(
+                f"{callers:>3} callers {label:<8} {result['chunks_per_s']:8.1f} chunks/s  "
+                f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms"
+            )
+        print(f"{'':>12}mean batch {batcher.stats()['mean_batch']} chunks")
+
+
+if __name__ == "__main__":
+    main()
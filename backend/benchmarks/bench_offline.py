@@ -0,0 +1,365 @@
+# bench_offline.py
+#
+# Throughput of the bias_models stages with no Hugging Face Hub access, for CI and
+# air-gapped machines. The script builds tiny, randomly initialised models with the
+# production architectures in a local folder and swaps them in:
+# - DistilBERT, RoBERTa and DeBERTa-v2 bias classifiers;
+# - a DistilBERT emotion classifier;
+# - a Marian hi->en translator;
+# - tokenizers for all of them, trained on synthetic text.
+# It then sweeps document length, chunk size, batch size and torch threads through
+# analyze_bias, analyze_sentiment_emotion and translate_chunks. The predictions
+# are noise; only the timings mean anything. Needs transformers, torch, tokenizers
+# and sentencepiece, but no downloads.
+#
+#   python benchmarks/bench_offline.py --output offline.json
+#   python benchmarks/bench_offline.py --baseline offline.json   # exits 1 if a row got slower
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+BIAS_MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bias_models")
+
+ENGLISH_WORDS = (
+    "government minister budget election court police city rural market health school climate "
+    "parliament economy farmers protest report village tax hospital railway cricket monsoon "
+    "the a of and to in said would will new plan critics supporters opposition voters"
+).split()
+HINDI_WORDS = (
+    "सरकार मंत्री बजट चुनाव अदालत पुलिस शहर ग्रामीण बाजार स्वास्थ्य स्कूल जलवायु संसद "
+    "अर्थव्यवस्था किसान विरोध रिपोर्ट गांव कर अस्पताल रेलवे क्रिकेट मानसून और के में है था कहा"
+).split()
+
+# Architectures of the registry models they stand in for, with the same label sets
+BIAS_ARCHITECTURES = {"distilbert": "distilbert", "roberta": "roberta", "mdeberta": "deberta-v2"}
+EMOTION_LABELS = ["sadness", "joy", "love", "anger", "fear", "surprise"]
+# langdetect may call short synthetic Devanagari text Marathi or Nepali
+TRANSLATED_LANGUAGES = ("hi", "mr", "ne")
+
+
+def synthetic_text(words, word_count, seed):
+    """Sentences of 8 to 30 random words, so the sentence packer has boundaries to work with."""
+    rng = random.Random(seed)
+    sentences, total = [], 0
+    while total < word_count:
+        length = min(rng.randint(8, 30), word_count - total)
+        sentences.append(" ".join(rng.choice(words) for _ in range(length)).capitalize() + ".")
+        total += length
+    return " ".join(sentences)
+
+
+def corpus(size=2000):
+    return [synthetic_text(words, 20, seed) for seed in range(size) for words in (ENGLISH_WORDS, HINDI_WORDS)]
+
+
+def train_tokenizer(texts, model, trainer, normalizer, pre_tokenizer, decoder, cls, sep):
+    """A tokenizers.Tokenizer trained on `texts`, adding `cls` ... `sep` around each input like the real model's."""
+    from tokenizers import Tokenizer, processors
+
+    tokenizer = Tokenizer(model)
+    if normalizer is not None:
+        tokenizer.normalizer = normalizer
+    tokenizer.pre_tokenizer = pre_tokenizer
+    tokenizer.decoder = decoder
+    tokenizer.train_from_iterator(texts, trainer)
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single=f"{cls} $A {sep}",
+        pair=f"{cls} $A {sep} $B:1 {sep}:1",
+        special_tokens=[(token, tokenizer.token_to_id(token)) for token in (cls, sep)],
+    )
+    return tokenizer
+
+
+def build_tokenizer(architecture, texts, vocab_size):
+    """Fast tokenizer of the architecture's class (WordPiece, byte-level BPE or Unigram), with a small trained vocabulary."""
+    from tokenizers import decoders, models, normalizers, pre_tokenizers, trainers
+    from transformers import DebertaV2TokenizerFast, DistilBertTokenizerFast, RobertaTokenizerFast
+
+    if architecture == "distilbert":
+        special = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+        tokenizer = train_tokenizer(
+            texts, models.WordPiece(unk_token="[UNK]"), trainers.WordPieceTrainer(vocab_size=vocab_size, special_tokens=special),
+            normalizers.BertNormalizer(lowercase=True), pre_tokenizers.BertPreTokenizer(), decoders.WordPiece(),
+            "[CLS]", "[SEP]",
+        )
+        return DistilBertTokenizerFast(tokenizer_object=tokenizer, model_max_length=512)
+    if architecture == "roberta":
+        special = ["<s>", "<pad>", "</s>", "<unk>", "<mask>"]
+        trainer = trainers.BpeTrainer(
+            vocab_size=vocab_size, special_tokens=special, initial_alphabet=pre_tokenizers.ByteLevel.alphabet()
+        )
+        tokenizer = train_tokenizer(
+            texts, models.BPE(), trainer, None, pre_tokenizers.ByteLevel(add_prefix_space=False), decoders.ByteLevel(),
+            "<s>", "</s>",
+        )
+        return RobertaTokenizerFast(tokenizer_object=tokenizer, model_max_length=512)
+    special = ["[PAD]", "[CLS]", "[SEP]", "[UNK]", "[MASK]"]
+    tokenizer = train_tokenizer(
+        texts, models.Unigram(), trainers.UnigramTrainer(vocab_size=vocab_size, special_tokens=special, unk_token="[UNK]"),
+        None, pre_tokenizers.Metaspace(), decoders.Metaspace(), "[CLS]", "[SEP]",
+    )
+    return DebertaV2TokenizerFast(tokenizer_object=tokenizer, model_max_length=512)
+
+
+def build_classifier(directory, architecture, labels, texts, args):
+    from transformers import (
+        AutoModelForSequenceClassification, DebertaV2Config, DistilBertConfig, RobertaConfig,
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    label_kwargs = {"id2label": dict(enumerate(labels)), "label2id": {label: i for i, label in enumerate(labels)}}
+    tokenizer = build_tokenizer(architecture, texts, args.vocab_size)
+    if architecture == "distilbert":
+        config = DistilBertConfig(
+            vocab_size=len(tokenizer), dim=args.hidden, hidden_dim=args.hidden * 4, n_layers=args.layers,
+            n_heads=args.heads, max_position_embeddings=args.max_positions, **label_kwargs,
+        )
+    elif architecture == "roberta":
+        # RoBERTa positions start after the padding index
+        config = RobertaConfig(
+            vocab_size=len(tokenizer), hidden_size=args.hidden, intermediate_size=args.hidden * 4,
+            num_hidden_layers=args.layers, num_attention_heads=args.heads,
+            max_position_embeddings=args.max_positions + 2, pad_token_id=tokenizer.pad_token_id, **label_kwargs,
+        )
+    else:
+        config = DebertaV2Config(
+            vocab_size=len(tokenizer), hidden_size=args.hidden, intermediate_size=args.hidden * 4,
+            num_hidden_layers=args.layers, num_attention_heads=args.heads,
+            max_position_embeddings=args.max_positions, pad_token_id=tokenizer.pad_token_id, **label_kwargs,
+        )
+    AutoModelForSequenceClassification.from_config(config).save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+
+
+def build_translator(directory, texts, args):
+    import sentencepiece
+    from config import MAX_TRANSLATION_LENGTH
+    from transformers import MarianConfig, MarianMTModel, MarianTokenizer
+
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, "spm")
+    sentencepiece.SentencePieceTrainer.train(
+        sentence_iterator=iter(texts), model_prefix=prefix, vocab_size=args.vocab_size,
+        model_type="unigram", hard_vocab_limit=False, minloglevel=2,
+    )
+    processor = sentencepiece.SentencePieceProcessor(model_file=prefix + ".model")
+    vocab = {processor.id_to_piece(i): i for i in range(processor.get_piece_size())}
+    vocab.setdefault("<pad>", len(vocab))
+    with open(os.path.join(directory, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(vocab, f, ensure_ascii=False)
+
+    tokenizer = MarianTokenizer(
+        source_spm=prefix + ".model", target_spm=prefix + ".model", vocab=os.path.join(directory, "vocab.json"),
+        source_lang="hi", target_lang="en", model_max_length=512,
+    )
+    config = MarianConfig(
+        vocab_size=len(vocab), decoder_vocab_size=len(vocab), d_model=args.hidden,
+        encoder_layers=args.layers, decoder_layers=args.layers,
+        encoder_attention_heads=args.heads, decoder_attention_heads=args.heads,
+        encoder_ffn_dim=args.hidden * 4, decoder_ffn_dim=args.hidden * 4,
+        # Random weights never emit </s>, so generation runs to the longest max_length translate_batch asks for
+        max_position_embeddings=max(args.max_positions, MAX_TRANSLATION_LENGTH),
+        pad_token_id=vocab["<pad>"], eos_token_id=vocab["</s>"],
+        decoder_start_token_id=vocab["<pad>"], forced_eos_token_id=vocab["</s>"], num_beams=1,
+    )
+    MarianMTModel(config).save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+
+
+def build_models(models_dir, args):
+    """Builds every tiny model under models_dir, skipping the ones already there."""
+    import torch
+    from model_registry import BIAS_MODELS
+
+    torch.manual_seed(0)
+    texts = corpus()
+    specs = [(name, arch, None) for name, arch in BIAS_ARCHITECTURES.items()]
+    specs += [("emotion", "distilbert", EMOTION_LABELS), ("translator", "marian", None)]
+    for name, architecture, labels in specs:
+        directory = os.path.join(models_dir, name)
+        if os.path.exists(os.path.join(directory, "config.json")) and not args.rebuild:
+            continue
+        print(f"🔧 Building tiny {architecture} ({name}) in {directory}")
+        if architecture == "marian":
+            build_translator(directory, texts, args)
+        else:
+            build_classifier(directory, architecture, labels or BIAS_MODELS[name]["labels"], texts, args)
+
+
+def timed(fn, repeat):
+    """Median wall time of `repeat` calls, after one untimed call that loads the model."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def sweep(models_dir, args):
+    import torch
+    import transformers
+    from biasmodel import analyze_bias
+    from document import Document
+    from model_registry import load_tokenizer
+    from sentiment_emotion import analyze_sentiment_emotion, chunk_text as emotion_chunks
+    from translator import get_translator, translate_chunks
+
+    # Random weights trip generation-length warnings on every call, and the pipelines warn about deprecated options
+    transformers.logging.set_verbosity_error()
+    warnings.simplefilter("ignore")
+    marian_tokenizer = get_translator(os.path.join(models_dir, "translator")).tokenizer
+    rows = []
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        for words in args.doc_words:
+            english = synthetic_text(ENGLISH_WORDS, words, seed=words)
+            hindi = synthetic_text(HINDI_WORDS, words, seed=words)
+            for chunk_size in args.chunk_sizes:
+                for batch_size in args.batch_sizes:
+                    cell = {"doc_words": words, "chunk_size": chunk_size, "batch_size": batch_size, "threads": threads}
+
+                    def record(stage, model, chunks, seconds):
+                        row = {
+                            "stage": stage, "model": model, **cell, "chunks": len(chunks),
+                            "seconds": round(seconds, 5), "chunks_per_s": round(len(chunks) / seconds, 2),
+                        }
+                        rows.append(row)
+                        print_row(row)
+
+                    for model in args.bias_models:
+                        chunks = Document(english).pack(load_tokenizer(model), max_length=chunk_size)
+                        seconds = timed(lambda: analyze_bias(chunks, model_name=model, batch_size=batch_size), args.repeat)
+                        record("analyze_bias", model, chunks, seconds)
+
+                    seconds = timed(
+                        lambda: analyze_sentiment_emotion(english, batch_size=batch_size, max_length=chunk_size), args.repeat
+                    )
+                    record("analyze_sentiment_emotion", "emotion", emotion_chunks(english, max_length=chunk_size), seconds)
+
+                    if args.translate:
+                        chunks = Document(hindi).pack(marian_tokenizer, max_length=chunk_size)
+                        seconds = timed(
+                            lambda: translate_chunks(chunks, source_lang="hi", batch_size=batch_size), args.translate_repeat
+                        )
+                        record("translate_chunks", "marian", chunks, seconds)
+    return rows
+
+
+def row_key(row):
+    return tuple(row[field] for field in ("stage", "model", "doc_words", "chunk_size", "batch_size", "threads"))
+
+
+def print_row(row, baseline=None):
+    line = (
+        f"{row['stage']:<26} {row['model']:<10} {row['doc_words']:>6} words  chunk {row['chunk_size']:>4}  "
+        f"batch {row['batch_size']:>3}  threads {row['threads']:>2}  {row['chunks']:>4} chunks  "
+        f"{row['seconds'] * 1000:9.1f} ms  {row['chunks_per_s']:9.1f} chunks/s"
+    )
+    if baseline is not None:
+        line += f"  ({row['chunks_per_s'] / baseline['chunks_per_s'] - 1:+.0%} vs baseline)"
+    print(line)
+
+
+def compare(rows, baseline_path, tolerance):
+    """Prints the rows that got slower than the baseline by more than `tolerance`, and returns how many."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {row_key(row): row for row in json.load(f)["rows"]}
+    regressions = 0
+    print(f"\n📊 Compared with {baseline_path} (tolerance {tolerance:.0%}):")
+    for row in rows:
+        before = baseline.get(row_key(row))
+        if before is None or row["chunks_per_s"] >= before["chunks_per_s"] * (1 - tolerance):
+            continue
+        regressions += 1
+        print("⚠️ ", end="")
+        print_row(row, before)
+    if not regressions:
+        print("✅ No regressions")
+    return regressions
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark with tiny local models")
+    parser.add_argument("--models-dir", default=os.path.join(tempfile.gettempdir(), "bias_models_offline"))
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the tiny models even if present")
+    parser.add_argument("--hidden", type=int, default=128)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--heads", type=int, default=2)
+    parser.add_argument("--vocab-size", type=int, default=2000)
+    parser.add_argument("--max-positions", type=int, default=512)
+    parser.add_argument("--bias-models", nargs="+", default=list(BIAS_ARCHITECTURES), choices=list(BIAS_ARCHITECTURES))
+    parser.add_argument("--doc-words", type=int, nargs="+", default=[250, 1000, 4000])
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[128, 512])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--threads", type=int, nargs="+", default=sorted({1, cores}))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-translate", dest="translate", action="store_false", help="skip translate_chunks")
+    parser.add_argument("--translate-repeat", type=int, default=1, help="random Marian weights decode to max_length, so runs are slow")
+    parser.add_argument("--output", help="write the rows to this JSON file")
+    parser.add_argument("--baseline", help="JSON from an earlier --output run to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="allowed throughput drop before a row counts as a regression (tiny models are noisy; raise --repeat to tighten)",
+    )
+    args = parser.parse_args()
+
+    models_dir = os.path.abspath(args.models_dir)
+    # bias_models runs from its own folder, so paths given on the command line are resolved first
+    output = args.output and os.path.abspath(args.output)
+    baseline = args.baseline and os.path.abspath(args.baseline)
+    # Read by bias_models/config.py at import, so they are set first
+    os.environ.update({
+        "HF_HUB_OFFLINE": "1",
+        "TRANSFORMERS_OFFLINE": "1",
+        "INFERENCE_CACHE": "0",
+        "MICRO_BATCHING": "0",
+        "INSTRUMENTATION": "0",
+        "SENTIMENT_MODEL": os.path.join(models_dir, "emotion"),
+    })
+    sys.path.insert(0, BIAS_MODELS_DIR)
+    os.chdir(BIAS_MODELS_DIR)
+
+    import config
+    from model_registry import BIAS_MODELS
+
+    build_models(models_dir, args)
+    for name in BIAS_ARCHITECTURES:
+        BIAS_MODELS[name]["path"] = os.path.join(models_dir, name)
+    config.TRANSLATION_MODELS.update({lang: os.path.join(models_dir, "translator") for lang in TRANSLATED_LANGUAGES})
+
+    rows = sweep(models_dir, args)
+
+    if output:
+        import torch
+        import transformers
+
+        meta = {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "transformers": transformers.__version__,
+            "cpu_count": cores,
+            "model": {"hidden": args.hidden, "layers": args.layers, "heads": args.heads, "vocab_size": args.vocab_size},
+        }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "rows": rows}, f, indent=2)
+        print(f"✅ Results saved to {output}")
+    if baseline and compare(rows, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# bench_serialization.py
+#
+# Compares the default (Pydantic) and FAST_SERIALIZATION paths for rendering a
+# page of GET /articles, plus what gzip/brotli do to the body size.
+#
+#   python benchmarks/bench_serialization.py --articles 2000 --page-size 200
+
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from models import Articles
+from serialization import dumps, orjson
+from storage import MemoryArticleRepository, SQLiteArticleRepository
+from synthetic import synthetic_article
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GET /articles serialization paths")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"JSON encoder for the fast path: {'orjson' if orjson else 'json (stdlib)'}")
+    articles = [synthetic_article(i) for i in range(args.articles)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "memory": MemoryArticleRepository(),
+            "sqlite": SQLiteArticleRepository(os.path.join(tmp, "bench.db")),
+        }
+        for name, store in stores.items():
+            store.add_many(articles)
+
+            def pydantic_path():
+                page = store.page(None, args.page_size)
+                return Articles(articles=page).model_dump_json().encode()
+
+            def fast_path():
+                return dumps({"articles": store.page_records(None, args.page_size), "next_cursor": None})
+
+            slow = timed(pydantic_path, args.repeat)
+            fast = timed(fast_path, args.repeat)
+            print(
+                f"[{name}] page of {args.page_size}: pydantic {slow * 1000:.1f} ms, "
+                f"fast {fast * 1000:.1f} ms ({slow / fast:.2f}x, "
+                f"{args.page_size / fast:,.0f} articles/s)"
+            )
+
+        body = fast_path()
+        print(f"body: {len(body):,} bytes")
+        # Same settings as CompressionMiddleware, so these are the sizes the server sends
+        gz = timed(lambda: gzip.compress(body, GZIP_LEVEL), args.repeat)
+        print(f"gzip (level {GZIP_LEVEL}): {len(gzip.compress(body, GZIP_LEVEL)):,} bytes in {gz * 1000:.1f} ms")
+        if brotli is not None:
+            br = timed(lambda: brotli.compress(body, quality=BROTLI_QUALITY), args.repeat)
+            print(
+                f"brotli (quality {BROTLI_QUALITY}): {len(brotli.compress(body, quality=BROTLI_QUALITY)):,} bytes "
+                f"in {br * 1000:.1f} ms"
+            )
+        else:
+            print("brotli: not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# load_test.py
+#
+# Seeds synthetic corpora and drives the API in-process through httpx's ASGI
+# transport with concurrent clients. Every corpus size runs in its own process so
+# peak RSS is per size. Results go to a JSON file; pass --baseline to diff a run
+# against a previous one (benchmarks/baseline.json is the committed reference).
+#
+#   python benchmarks/load_test.py --sizes 1000 10000 100000 --output results.json
+#   python benchmarks/load_test.py --baseline benchmarks/baseline.json
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+ENDPOINTS = ("list", "get", "create")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(latencies: Dict[str, List[float]], elapsed: float) -> Dict[str, dict]:
+    summary = {}
+    for endpoint, samples in latencies.items():
+        if not samples:
+            continue
+        summary[endpoint] = {
+            "requests": len(samples),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        }
+    return summary
+
+
+async def drive(app, ids: List[str], size: int, requests: int, concurrency: int, page_size: int) -> dict:
+    import httpx
+
+    latencies: Dict[str, List[float]] = {endpoint: [] for endpoint in ENDPOINTS}
+    rng = random.Random(0)
+    # Mostly reads, like the dashboard: 45% list, 45% single article, 10% create
+    plan = rng.choices(ENDPOINTS, weights=(45, 45, 10), k=requests)
+    queue: asyncio.Queue = asyncio.Queue()
+    for i, endpoint in enumerate(plan):
+        queue.put_nowait((i, endpoint))
+
+    from synthetic import synthetic_payload
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker():
+            while True:
+                try:
+                    i, endpoint = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                if endpoint == "list":
+                    call = client.get("/articles", params={"limit": page_size})
+                elif endpoint == "get":
+                    call = client.get(f"/articles/{rng.choice(ids)}")
+                else:
+                    payload = synthetic_payload(size + i).model_dump(mode="json")
+                    call = client.post("/articles", json=payload)
+                start = time.perf_counter()
+                response = await call
+                latencies[endpoint].append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{endpoint} failed with {response.status_code}: {response.text[:200]}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total_rps": round(requests / elapsed, 1),
+        "endpoints": summarize(latencies, elapsed),
+    }
+
+
+def run_size(args) -> dict:
+    """Runs inside a fresh process: seed one corpus, then load it."""
+    tmp = tempfile.mkdtemp()
+    os.environ["ARTICLE_STORE"] = args.store  # an exported ARTICLE_STORE would mislabel the results
+    os.environ["ARTICLE_DB_PATH"] = os.path.join(tmp, "bench.db")
+    os.environ["ANALYSIS_WORKERS"] = "0"  # inference is out of scope here
+
+    import main
+    from synthetic import synthetic_article
+
+    seed_start = time.perf_counter()
+    ids = []
+    batch = []
+    for i in range(args.size):
+        article = synthetic_article(i)
+        ids.append(str(article.id))
+        batch.append(article)
+        if len(batch) == 1000:
+            main.repository.add_many(batch)
+            batch = []
+    if batch:
+        main.repository.add_many(batch)
+    seed_seconds = time.perf_counter() - seed_start
+
+    result = asyncio.run(drive(main.app, ids, args.size, args.requests, args.concurrency, args.page_size))
+    result.update({
+        "articles": args.size,
+        "seed_s": round(seed_seconds, 2),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    })
+    return result
+
+
+def compare(results: dict, baseline: dict) -> None:
+    print("\nChange vs baseline (negative latency / positive rps is better):")
+    base_runs = {run["articles"]: run for run in baseline["runs"]}
+    for run in results["runs"]:
+        base = base_runs.get(run["articles"])
+        if base is None:
+            continue
+        for endpoint, stats in run["endpoints"].items():
+            old = base["endpoints"].get(endpoint)
+            if not old:
+                continue
+            deltas = ", ".join(
+                f"{metric} {(stats[metric] - old[metric]) / old[metric] * 100:+.1f}%"
+                for metric in ("p50_ms", "p95_ms", "p99_ms", "rps")
+                if old[metric]
+            )
+            print(f"  {run['articles']:>7} {endpoint:<6} {deltas}")
+        rss = (run["peak_rss_mb"] - base["peak_rss_mb"]) / base["peak_rss_mb"] * 100
+        print(f"  {run['articles']:>7} peak RSS {rss:+.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the articles API at several corpus sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per corpus size")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--store", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--output", default="load_test_results.json")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)  # internal: run one size
+    args = parser.parse_args()
+
+    if args.size is not None:
+        print(json.dumps(run_size(args)))
+        return
+
+    runs = []
+    for size in args.sizes:
+        print(f"🚀 {size:,} articles...")
+        command = [
+            sys.executable, os.path.abspath(__file__), "--size", str(size),
+            "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+            "--page-size", str(args.page_size), "--store", args.store,
+        ]
+        completed = subprocess.run(command, stdout=subprocess.PIPE, text=True, check=True, cwd=BACKEND_DIR)
+        run = json.loads(completed.stdout.strip().splitlines()[-1])
+        runs.append(run)
+        for endpoint, stats in run["endpoints"].items():
+            print(
+                f"   {endpoint:<6} p50 {stats['p50_ms']:.2f} ms  p95 {stats['p95_ms']:.2f} ms  "
+                f"p99 {stats['p99_ms']:.2f} ms  {stats['rps']:.0f} req/s"
+            )
+        print(f"   total {run['total_rps']:.0f} req/s, peak RSS {run['peak_rss_mb']} MB")
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "store": args.store,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "page_size": args.page_size,
+        "runs": runs,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# parity_check.py
+#
+# Runs the bias and emotion classifiers on the fp32 PyTorch path and on another
+# inference backend (quantized int8 or ONNX Runtime), then reports label
+# agreement, score drift and chunks/s for both. Exits non-zero when agreement
+# for any model falls below --min-agreement.
+#
+#   python benchmarks/parity_check.py --backend quantized
+#   python benchmarks/parity_check.py --backend onnx --texts articles.jsonl --models distilbert mbert
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BIAS_MODELS_DIR = os.path.join(BACKEND_DIR, "bias_models")
+sys.path.insert(0, BIAS_MODELS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BIAS_MODELS_DIR)
+
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from chunker import chunk_text
+from config import SENTIMENT_MODEL
+from inference import apply_backend, predict_proba
+from model_registry import BIAS_MODELS, load_model
+
+
+def load_texts(path):
+    """Plain text file (one document) or JSONL with a "text" field per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        if not path.endswith(".jsonl"):
+            return [f.read()]
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+
+def load_pair(name, backend):
+    if name == "emotion":
+        tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+        reference = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL).eval()
+        candidate = apply_backend(
+            AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL).eval(), SENTIMENT_MODEL, backend
+        )
+        return tokenizer, reference, candidate
+    tokenizer, reference = load_model(name, backend="torch")
+    _, candidate = load_model(name, backend=backend)
+    return tokenizer, reference, candidate
+
+
+def timed(tokenizer, model, chunks):
+    start = time.perf_counter()
+    scores = predict_proba(tokenizer, model, chunks)
+    return scores, len(chunks) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check an inference backend against fp32 PyTorch")
+    parser.add_argument("--backend", choices=["quantized", "onnx"], default="quantized")
+    parser.add_argument("--texts", default=os.path.join(BIAS_MODELS_DIR, "input.txt"))
+    parser.add_argument("--models", nargs="+", default=sorted(BIAS_MODELS) + ["emotion"])
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    args = parser.parse_args()
+
+    chunks = [chunk for text in load_texts(args.texts) for chunk in chunk_text(text)]
+    if not chunks:
+        sys.exit("❌ No text to check")
+    print(f"📄 {len(chunks)} chunks, fp32 vs {args.backend}")
+
+    failed = False
+    for name in args.models:
+        tokenizer, reference, candidate = load_pair(name, args.backend)
+        # Warm both paths once so one-off graph/kernel setup is not timed
+        predict_proba(tokenizer, reference, chunks[:1])
+        predict_proba(tokenizer, candidate, chunks[:1])
+        expected, fp32_rate = timed(tokenizer, reference, chunks)
+        actual, rate = timed(tokenizer, candidate, chunks)
+
+        agree = sum(a.argmax() == b.argmax() for a, b in zip(expected, actual)) / len(chunks)
+        drift = max(abs(a - b).max() for a, b in zip(expected, actual))
+        ok = agree >= args.min_agreement
+        failed |= not ok
+        print(
+            f"{'✅' if ok else '❌'} {name:<10} agreement {agree:.1%}  max score drift {drift:.3f}  "
+            f"fp32 {fp32_rate:.1f} chunks/s  {args.backend} {rate:.1f} chunks/s ({rate / fp32_rate:.2f}x)"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# synthetic.py
+# Deterministic fake articles for the benchmarks
+
+import random
+from datetime import datetime, timedelta
+
+from models import Article, CreateArticlePayload
+
+WORDS = (
+    "government minister budget election court police city rural market health school climate "
+    "parliament economy farmers protest report village tax hospital railway cricket monsoon"
+).split()
+
+
+def synthetic_payload(i: int) -> CreateArticlePayload:
+    rng = random.Random(i)
+    body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(300, 1200)))
+    return CreateArticlePayload(
+        title=f"Article {i}: " + " ".join(rng.choice(WORDS) for _ in range(8)),
+        link=f"https://news.example.com/{i}",
+        source=f"source-{i % 20}",
+        authors=[f"Author {i % 50}"],
+        summary=body[:300],
+        text=body,
+        keywords=rng.sample(WORDS, 4),
+        published_at=datetime(2024, 1, 1) + timedelta(minutes=i),
+    )
+
+
+def synthetic_article(i: int) -> Article:
+    return Article(**synthetic_payload(i).model_dump())
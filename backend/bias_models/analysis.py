@@ -0,0 +1,105 @@
+# analysis.py
+
+from chunker import chunk_text
+from sentiment_emotion import analyze_emotions
+from translator import translate_chunks
+from biasmodel import analyze_bias
+from ensemble import analyze_bias_ensemble
+from cascade import analyze_bias_cascade
+from language_utils import detect_language
+from document import Document
+from model_registry import load_tokenizer
+from config import (
+    BIAS_MODE, BIAS_MODEL, ENSEMBLE_MODELS, CASCADE_FAST_MODEL, CASCADE_ACCURATE_MODEL, TRANSLATOR_MODEL,
+)
+from instrumentation import span
+
+# Bias models each mode runs, first one sizing the chunks of English text
+MODE_MODELS = {
+    "single": [BIAS_MODEL],
+    "ensemble": ENSEMBLE_MODELS,
+    "cascade": [CASCADE_FAST_MODEL, CASCADE_ACCURATE_MODEL],
+}
+
+
+def analyze_text(input_text):
+    """Runs the full chunk -> sentiment -> translate -> bias pipeline on one text."""
+    # Step 1: Detect language
+    with span("language_detection"):
+        lang = detect_language(input_text)
+    print(f"🌐 Detected Language: {lang}")
+
+    # Step 2: Pack the input into whole-sentence chunks (each tokenizer runs over the text once).
+    # English text goes to the bias models untranslated, so their own tokenizers size the chunks:
+    # every model of the mode (ensemble members, both cascade stages) scores the same chunks,
+    # so each chunk must fit all of them.
+    document = Document(input_text)
+    models = MODE_MODELS.get(BIAS_MODE, [BIAS_MODEL])
+    with span("chunking") as s:
+        if lang.lower() == "en":
+            tokenizers = [load_tokenizer(name) for name in models]
+            chunks = chunk_text(document, tokenizer=tokenizers[0], also_fit=tokenizers[1:])
+        else:
+            chunks = chunk_text(document)
+        s.set(items=len(chunks))
+
+    # Step 3: Sentiment analysis on original chunks
+    print("🧠 Performing sentiment analysis...")
+    with span("sentiment") as s:
+        sentiment_results, emotion_distribution = analyze_emotions(document)
+        s.set(items=len(sentiment_results))
+    tone_overall = max(emotion_distribution, key=emotion_distribution.get) if emotion_distribution else "unknown"
+
+    # Step 4: Translate only if not English
+    if lang.lower() != "en":
+        print("🌍 Translating chunks to English...")
+        with span("translation", items=len(chunks), language=lang):
+            translated_chunks = translate_chunks(chunks, source_lang=lang)
+    else:
+        translated_chunks = chunks  # already in English
+
+    # Step 5: Bias analysis on translated chunks
+    print("⚖️ Analyzing bias...")
+    with span("bias_inference", items=len(translated_chunks), mode=BIAS_MODE):
+        if BIAS_MODE == "ensemble":
+            bias_result = analyze_bias_ensemble(translated_chunks, sentiment_results)
+        elif BIAS_MODE == "cascade":
+            bias_result = analyze_bias_cascade(translated_chunks, sentiment_results)
+        else:
+            bias_result = analyze_bias(translated_chunks, sentiment_results)
+
+    result = {
+        "language": lang,
+        "bias_overall": bias_result["bias_overall"],
+        "tone_overall": tone_overall,
+        "emotion_distribution": emotion_distribution,
+        "remarks": bias_result["remarks"],
+        "highlighted_bias_lines": bias_result["highlighted_bias_lines"],
+        "highlighted_sentiments": sentiment_results
+    }
+    # Mode-specific extras: the ensemble's score and votes, the cascade's escalation count
+    for key in ("bias_score", "model_votes", "escalated_chunks"):
+        if key in bias_result:
+            result[key] = bias_result[key]
+    return result
+
+
+def warmup(include_translator=False):
+    """
+    Loads the models analyze_text needs up front, e.g. when a worker process starts,
+    so the first article does not pay for it. Nothing is loaded at import time.
+    """
+    from chunker import get_tokenizer as chunker_tokenizer
+    from sentiment_emotion import get_emotion_pipe, get_model_info
+    from model_registry import registry
+
+    print("🔥 Warming up analysis models...")
+    chunker_tokenizer()
+    get_model_info()
+    get_emotion_pipe()
+    for name in MODE_MODELS.get(BIAS_MODE, [BIAS_MODEL]):
+        registry.get(name)
+    if include_translator:
+        from translator import get_translator
+
+        get_translator(TRANSLATOR_MODEL)
@@ -0,0 +1,171 @@
+# batch.py
+# Backfill mode: scores many documents on a process pool and appends one JSON line
+# per finished document to the output file. The output doubles as the checkpoint,
+# so re-running the same command after an interruption skips finished documents.
+#
+#   python batch.py --input articles.jsonl --output results.jsonl --workers 4
+#   python batch.py --store ../articles.db --output results.jsonl --write-back
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+BIAS_MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BIAS_MODELS_DIR)
+
+STORE_PAGE_SIZE = 500
+
+
+def _init_worker(threads):
+    # Cap intra-op threads before torch is imported, so N workers do not oversubscribe the cores
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[name] = str(threads)
+    sys.path.insert(0, BIAS_MODELS_DIR)
+    os.chdir(BIAS_MODELS_DIR)
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def _analyze(text):
+    from analysis import analyze_text
+
+    return analyze_text(text)
+
+
+def document_text(record):
+    """Same input the API's analysis queue builds: title, blank line, body (or summary)."""
+    body = record.get("text") or record.get("summary")
+    if not body:
+        return None
+    return f"{record['title']}\n\n{body}" if record.get("title") else body
+
+
+def read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield str(record.get("id", line_no)), document_text(record)
+
+
+def open_store(path):
+    sys.path.insert(0, BACKEND_DIR)
+    from storage import SQLiteArticleRepository
+
+    return SQLiteArticleRepository(path)
+
+
+def read_store(path):
+    repository = open_store(path)
+    from storage import record_sort_key
+
+    before = None
+    while True:
+        records = repository.page_records(before, STORE_PAGE_SIZE)
+        for record in records:
+            yield record["id"], document_text(record)
+        if len(records) < STORE_PAGE_SIZE:
+            return
+        before = record_sort_key(records[-1])
+
+
+def load_checkpoint(path):
+    """Ids already finished in `path`. A torn last line from a killed run is cut off."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            f.truncate(complete)
+    for line in data[:complete].decode("utf-8").splitlines():
+        entry = json.loads(line)
+        if "result" in entry:
+            done.add(entry["id"])
+    return done
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Score a corpus with the bias & sentiment pipeline")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL file with id, title, summary and text per line")
+    source.add_argument("--store", help="SQLite article store (ARTICLE_DB_PATH of the API)")
+    parser.add_argument("--output", required=True, help="results JSONL, appended to and used to resume")
+    parser.add_argument("--workers", type=int, default=max(1, cores // 4))
+    parser.add_argument("--threads-per-worker", type=int, help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--write-back", action="store_true", help="also save results to --store")
+    args = parser.parse_args()
+    if args.write_back and not args.store:
+        parser.error("--write-back needs --store")
+    threads = args.threads_per_worker or max(1, cores // args.workers)
+
+    done = load_checkpoint(args.output)
+    if done:
+        print(f"⏩ Resuming: {len(done):,} documents already scored")
+    documents = read_jsonl(args.input) if args.input else read_store(args.store)
+    repository = open_store(args.store) if args.write_back else None
+
+    print(f"🚀 {args.workers} workers x {threads} torch threads")
+    started = time.perf_counter()
+    scored = failed = skipped = 0
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    )
+    with pool, open(args.output, "a", encoding="utf-8") as out:
+
+        def write(entry):
+            out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            out.flush()
+
+        def collect(futures):
+            nonlocal scored, failed
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                doc_id = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    write({"id": doc_id, "error": str(e)})
+                    print(f"❌ Analysis failed for {doc_id}: {e}")
+                    continue
+                scored += 1
+                write({"id": doc_id, "result": result})
+                if repository is not None:
+                    repository.save_analysis(uuid.UUID(doc_id), "done", result)
+                if scored % 100 == 0:
+                    rate = scored / (time.perf_counter() - started)
+                    print(f"📈 {scored:,} scored ({rate:.1f} docs/s)")
+
+        # Keep a bounded number of documents in flight so the input is streamed, not loaded
+        futures = {}
+        for doc_id, text in documents:
+            if doc_id in done:
+                continue
+            if text is None:
+                skipped += 1
+                continue
+            futures[pool.submit(_analyze, text)] = doc_id
+            if len(futures) >= args.workers * 2:
+                collect(futures)
+        while futures:
+            collect(futures)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {scored:,} scored, {failed:,} failed, {skipped:,} without text in {elapsed:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,23 @@
 # bias_model.py
-# fastest results
+# fastest results (DistilBERT by default, any registry model by name)
 
-
-import os
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-from config import DEVICE, HUGGINGFACE_TOKEN
-
-# 🌐 Model details
-MODEL_NAME = "cajcodes/DistilBERT-PoliticalBias"
-LOCAL_MODEL_PATH = "./models/cajcodes_distilbert_model"
-
-# 🔽 Download the model if not already present
-def download_bias_model():
-    if not os.path.exists(LOCAL_MODEL_PATH):
-        print("⬇️ Downloading bias model with authentication...")
-        tokenizer = AutoTokenizer.from_pretrained(
-            MODEL_NAME, 
-            use_auth_token=HUGGINGFACE_TOKEN
-        )
-        model = AutoModelForSequenceClassification.from_pretrained(
-            MODEL_NAME, 
-            use_auth_token=HUGGINGFACE_TOKEN
-        )
-        os.makedirs(LOCAL_MODEL_PATH, exist_ok=True)
-        tokenizer.save_pretrained(LOCAL_MODEL_PATH)
-        model.save_pretrained(LOCAL_MODEL_PATH)
-        print("✅ Model downloaded and saved locally.")
-    else:
-        print("📁 Bias model already exists locally.")
-
-# 🧠 Load model
-def load_bias_model():
-    tokenizer = AutoTokenizer.from_pretrained(LOCAL_MODEL_PATH)
-    model = AutoModelForSequenceClassification.from_pretrained(LOCAL_MODEL_PATH)
-    return tokenizer, model.to(DEVICE)
+from config import BIAS_MODEL, BIAS_BATCH_SIZE
+from inference import cached_predict_proba
+from model_registry import BIAS_MODELS, registry
 
 # ⚖️ Analyze bias in text chunks
-def analyze_bias(chunks, sentiment_results=None):
-    download_bias_model()
-    tokenizer, model = load_bias_model()
-
-    print("🔍 Evaluating political leaning on text chunks...")
+def analyze_bias(chunks, sentiment_results=None, model_name=BIAS_MODEL, batch_size=BIAS_BATCH_SIZE):
+    print(f"🔍 Evaluating political leaning on text chunks ({model_name})...")
 
-    label_map = {0: "left", 1: "center", 2: "right"}
+    labels = BIAS_MODELS[model_name]["labels"]
+    label_map = dict(enumerate(labels))
     results = []
-    bias_counts = {"left": 0, "center": 0, "right": 0}
+    bias_counts = {label: 0 for label in labels}
+
+    # Chunks seen before come from the inference cache; the model is only loaded for the rest
+    chunk_scores = cached_predict_proba(registry.cache_key(model_name), lambda: registry.get(model_name), chunks, batch_size)
 
-    for chunk in chunks:
-        inputs = tokenizer(chunk, return_tensors="pt", truncation=True, padding=True).to(DEVICE)
-        with torch.no_grad():
-            outputs = model(**inputs)
-        scores = torch.nn.functional.softmax(outputs.logits, dim=1).cpu().numpy()[0]
+    for chunk, scores in zip(chunks, chunk_scores):
         pred_label = label_map[scores.argmax()]
         results.append({
             "chunk": chunk,
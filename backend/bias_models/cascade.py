@@ -0,0 +1,59 @@
+# cascade.py
+# Scores every chunk with the fast bias model and sends only the chunks it is
+# unsure about (top probability below CASCADE_THRESHOLD) to the accurate one.
+# Confident chunks keep the fast model's label, so mDeBERTa only runs where it matters.
+
+from config import CASCADE_FAST_MODEL, CASCADE_ACCURATE_MODEL, CASCADE_THRESHOLD
+from ensemble import COMMON_LABELS, score_chunks, to_common
+
+
+# ⚖️ Cascade bias analysis
+def analyze_bias_cascade(
+    chunks,
+    sentiment_results=None,
+    fast_model=CASCADE_FAST_MODEL,
+    accurate_model=CASCADE_ACCURATE_MODEL,
+    threshold=CASCADE_THRESHOLD,
+):
+    print(f"🔍 Evaluating political leaning with {fast_model}, escalating to {accurate_model} below {threshold:.0%}...")
+
+    fast_scores = score_chunks(fast_model, chunks)
+    escalate = [index for index, scores in enumerate(fast_scores) if float(scores.max()) < threshold]
+    accurate_scores = dict(zip(escalate, score_chunks(accurate_model, [chunks[i] for i in escalate])))
+    print(f"⬆️ Escalated {len(escalate)} of {len(chunks)} chunks to {accurate_model}")
+
+    results = []
+    bias_counts = dict.fromkeys(COMMON_LABELS, 0)
+    for index, chunk in enumerate(chunks):
+        # Both models' labels are folded onto left / center / right so their answers compare
+        name = accurate_model if index in accurate_scores else fast_model
+        common = to_common(name, accurate_scores.get(index, fast_scores[index]))
+        pred_label = max(common, key=common.get)
+        results.append({
+            "chunk": chunk,
+            "bias": pred_label,
+            "confidence": common[pred_label],
+            "model": name,
+        })
+        bias_counts[pred_label] += 1
+
+    # 📈 Overall prediction
+    bias_overall = max(bias_counts, key=bias_counts.get) if results else "center"
+    remarks = (
+        f"Text shows a tendency towards **{bias_overall.upper()}** leaning "
+        f"({len(escalate)} of {len(chunks)} chunks checked by {accurate_model})."
+    )
+
+    # 🔎 Highlight bias lines
+    highlighted_bias_lines = [
+        f"[{r['bias'].upper()} | {round(r['confidence']*100, 1)}%] {r['chunk'][:100]}..."
+        for r in results if r['bias'] != "center"
+    ]
+
+    return {
+        "bias_overall": bias_overall,
+        "escalated_chunks": len(escalate),
+        "total_chunks": len(chunks),
+        "remarks": remarks,
+        "highlighted_bias_lines": highlighted_bias_lines
+    }
@@ -1,85 +1,10 @@
-# biasmodel.py
+# biasmodel3.py
+# AllSides mBERT bias model, served from the shared model registry
 
-import os
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from config import DEVICE, HUGGINGFACE_TOKEN
+from biasmodel import analyze_bias as _analyze_bias
 
-# 🌐 Model name & local path
-MODEL_NAME = "premsa/political-bias-prediction-allsides-mBERT"
-LOCAL_MODEL_PATH = "./models/premsa_mbert_bias_model"
+MODEL_KEY = "mbert"
 
-# ⬇️ Download if not available
-def download_bias_model():
-    if not os.path.exists(LOCAL_MODEL_PATH):
-        print("⬇️ Downloading mBERT bias model with authentication...")
-        tokenizer = AutoTokenizer.from_pretrained(
-            MODEL_NAME,
-            use_auth_token=HUGGINGFACE_TOKEN
-        )
-        model = AutoModelForSequenceClassification.from_pretrained(
-            MODEL_NAME,
-            use_auth_token=HUGGINGFACE_TOKEN
-        )
-        os.makedirs(LOCAL_MODEL_PATH, exist_ok=True)
-        tokenizer.save_pretrained(LOCAL_MODEL_PATH)
-        model.save_pretrained(LOCAL_MODEL_PATH)
-        print("✅ Model downloaded and saved locally.")
-    else:
-        print("📁 Bias model already exists locally.")
-
-# 🧠 Load model
-def load_bias_model():
-    tokenizer = AutoTokenizer.from_pretrained(LOCAL_MODEL_PATH)
-    model = AutoModelForSequenceClassification.from_pretrained(LOCAL_MODEL_PATH)
-    return tokenizer, model.to(DEVICE)
-
-# ⚖️ Perform bias analysis
+# ⚖️ Bias analysis
 def analyze_bias(chunks, sentiment_results=None):
-    download_bias_model()
-    tokenizer, model = load_bias_model()
-
-    print("🔍 Evaluating political leaning using mBERT...")
-
-    # Labels as defined by the model
-    label_map = {
-        0: "left",
-        1: "center",
-        2: "right"
-    }
-
-    results = []
-    bias_counts = {"left": 0, "center": 0, "right": 0}
-
-    for chunk in chunks:
-        inputs = tokenizer(chunk, return_tensors="pt", truncation=True, padding=True).to(DEVICE)
-        with torch.no_grad():
-            outputs = model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=1).cpu().numpy()[0]
-        predicted_index = probs.argmax()
-        predicted_label = label_map[predicted_index]
-        confidence = float(probs[predicted_index])
-
-        results.append({
-            "chunk": chunk,
-            "bias": predicted_label,
-            "confidence": confidence
-        })
-
-        bias_counts[predicted_label] += 1
-
-    # 🧠 Determine overall bias
-    bias_overall = max(bias_counts, key=bias_counts.get)
-    remarks = f"Text shows a tendency towards **{bias_overall.upper()}** leaning."
-
-    # 📌 Highlight biased lines (non-center only)
-    highlighted_bias_lines = [
-        f"[{r['bias'].upper()} | {round(r['confidence']*100, 1)}%] {r['chunk'][:100]}..."
-        for r in results if r['bias'] != "center"
-    ]
-
-    return {
-        "bias_overall": bias_overall,
-        "remarks": remarks,
-        "highlighted_bias_lines": highlighted_bias_lines
-    }
+    return _analyze_bias(chunks, sentiment_results, model_name=MODEL_KEY)
@@ -1,23 +1,17 @@
 # chunker.py
-from transformers import AutoTokenizer
-from config import MAX_TOKENS
+from functools import lru_cache
+from config import CHUNK_STRIDE
+from document import as_document
 
-tokenizer = AutoTokenizer.from_pretrained("bert-base-multilingual-cased")
+# 👟 Tokenizer is loaded on first use, not at import
+@lru_cache(maxsize=None)
+def get_tokenizer():
+    from transformers import AutoTokenizer
 
-def chunk_text(text, max_tokens=MAX_TOKENS):
-    words = text.split()
-    chunks, current = [], []
-    count = 0
+    return AutoTokenizer.from_pretrained("bert-base-multilingual-cased")
 
-    for word in words:
-        token_len = len(tokenizer.tokenize(word))
-        if count + token_len > max_tokens:
-            chunks.append(" ".join(current))
-            current, count = [word], token_len
-        else:
-            current.append(word)
-            count += token_len
-
-    if current:
-        chunks.append(" ".join(current))
-    return chunks
+def chunk_text(text, tokenizer=None, stride=CHUNK_STRIDE, also_fit=()):
+    # One pass over the whole text (mBERT unless the target model's tokenizer is given),
+    # packed into whole-sentence chunks that fill the model's input length
+    # (and fit the models of any also_fit tokenizers too)
+    return as_document(text).pack(tokenizer or get_tokenizer(), stride=stride, also_fit=also_fit)
@@ -1,21 +1,52 @@
 # config.py
 import os
+import sys
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Shared backend modules (instrumentation) live one folder up; appended so they never shadow ours
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
 # 🔐 API Keys
 HUGGINGFACE_TOKEN = os.getenv("HF_TOKEN")
 
 # 🌐 Language Settings
 TARGET_LANG = "en"
-MAX_TOKENS = 500  # For chunking
+MAX_TOKENS = 500  # For chunking text for translation
+MODEL_MAX_LENGTH = 512  # Input limit for tokenizers that do not declare one
+CHUNK_STRIDE = int(os.getenv("CHUNK_STRIDE", "0"))  # Tokens of trailing sentences repeated at the start of the next chunk
 
 # 📦 Model Names
 TRANSLATOR_MODEL = "facebook/m2m100_418M"  # or try "Helsinki-NLP/opus-mt-xx-en"
-SENTIMENT_MODEL = "bhadresh-savani/distilbert-base-uncased-emotion" 
-BIAS_MODEL = "matous-volf/political-leaning-politics"  # Or a more robust bias-specific model
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "bhadresh-savani/distilbert-base-uncased-emotion")  # Hub id or local directory
+BIAS_MODEL = "distilbert"  # Registry name: distilbert, roberta, mdeberta or mbert
+BIAS_MODE = os.getenv("BIAS_MODE", "single")  # single (BIAS_MODEL only), ensemble (ENSEMBLE_MODELS voting) or cascade
+ENSEMBLE_MODELS = ["distilbert", "roberta", "mdeberta", "mbert"]
+CASCADE_FAST_MODEL = "distilbert"  # Scores every chunk in cascade mode
+CASCADE_ACCURATE_MODEL = "mdeberta"  # Re-scores the chunks the fast model is unsure about
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.75"))  # Fast-model confidence below which a chunk escalates
 TRANSLATOR_MODEL="Helsinki-NLP/opus-mt-hi-en"
+TRANSLATION_MODELS = {"hi": TRANSLATOR_MODEL}  # Explicit routes; other languages try OPUS_MT_MODEL
+OPUS_MT_MODEL = "Helsinki-NLP/opus-mt-{lang}-en"
+FALLBACK_TRANSLATOR_MODEL = "facebook/m2m100_418M"  # Multilingual, for languages without an opus-mt model
 # 🧠 Task Configurations
 USE_LOCAL_MODELS = True # Toggle this if switching to offline
 DEVICE = "cpu"  # or 'cuda' if GPU available
+BIAS_BATCH_SIZE = 16  # Chunks per forward pass in analyze_bias
+EMOTION_BATCH_SIZE = 16  # Chunks per emotion pipeline batch
+MICRO_BATCHING = os.getenv("MICRO_BATCHING", "0") == "1"  # Coalesce concurrent callers' chunks into shared batches
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))  # Chunks per coalesced batch
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "10"))  # Longest a request waits for company
+TRANSLATION_BATCH_SIZE = 8  # Chunks of one language per translation pass
+TRANSLATOR_CACHE_SIZE = 3  # Translation models kept loaded
+MAX_TRANSLATION_LENGTH = 1000  # Upper bound on generated tokens
+TRANSLATION_LENGTH_RATIO = 1.5  # Generated tokens allowed per input token
+MODEL_MEMORY_BUDGET_MB = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "3072"))  # Warm bias models kept loaded (all four fit in ~2.6 GB)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")  # torch (fp32), quantized (int8 dynamic) or onnx
+ONNX_MODELS_DIR = "./models/onnx"  # Exported ONNX graphs, reused across runs
+INFERENCE_CACHE_ENABLED = os.getenv("INFERENCE_CACHE", "1") == "1"  # Reuse chunk predictions across articles
+INFERENCE_CACHE_PATH = os.getenv("INFERENCE_CACHE_PATH", "./models/inference_cache.db")
+INFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("INFERENCE_CACHE_MAX_ENTRIES", "200000"))
@@ -0,0 +1,203 @@
+# document.py
+# One input text shared by every pipeline stage. Each tokenizer family runs over
+# the text once; chunks are character spans of the original string, so nothing
+# is rebuilt from tokens with convert_tokens_to_string.
+
+import bisect
+import re
+from config import MAX_TOKENS, MODEL_MAX_LENGTH
+
+# How far past the expected position a slow tokenizer's piece is looked for
+ALIGN_WINDOW = 64
+
+# A sentence ends after terminal punctuation (and any closing quote or bracket) followed by whitespace, or at a line break
+SENTENCE_BREAK = re.compile(r"[.!?\u0964]+[\"'\u201d\u2019)\]]*\s+|\n\s*")
+
+
+def tokenizer_key(tokenizer):
+    return (type(tokenizer).__name__, tokenizer.name_or_path)
+
+
+def align_offsets(text, tokens):
+    """
+    Character (start, end) spans for tokens from a slow tokenizer, found by scanning
+    the text left to right. Pieces that cannot be matched (normalized characters,
+    [UNK]) get an empty span at the current position; the scan resyncs on the next one.
+    """
+    offsets, pos = [], 0
+    for token in tokens:
+        piece = token.replace("▁", "").replace("##", "").strip()
+        start = text.find(piece, pos, pos + len(piece) + ALIGN_WINDOW) if piece else -1
+        if start == -1:
+            offsets.append((pos, pos))
+        else:
+            pos = start + len(piece)
+            offsets.append((start, pos))
+    return offsets
+
+
+def model_max_length(tokenizer):
+    """Longest input the tokenizer's model accepts, special tokens included. Tokenizers without a limit report a huge sentinel."""
+    limit = tokenizer.model_max_length
+    return limit if limit and limit <= 100_000 else MODEL_MAX_LENGTH
+
+
+def word_starts(offsets):
+    # A token starts a new word when whitespace separates it from the previous one
+    return [i == 0 or start > offsets[i - 1][1] for i, (start, _) in enumerate(offsets)]
+
+
+def word_cut(word_start, begin, end):
+    """Latest word start in (begin, end], so a span can end before a split word; end if the word fills the span."""
+    cut = end
+    while cut > begin + 1 and not word_start[cut]:
+        cut -= 1
+    return cut if word_start[cut] else end
+
+
+class Document:
+    def __init__(self, text):
+        self.text = text
+        self._offsets = {}
+        self._chunks = {}
+
+    def offsets(self, tokenizer):
+        """(start, end) character span of every token, without special tokens."""
+        key = tokenizer_key(tokenizer)
+        if key not in self._offsets:
+            if tokenizer.is_fast:
+                encoding = tokenizer(
+                    self.text,
+                    add_special_tokens=False,
+                    return_offsets_mapping=True,
+                    return_attention_mask=False,
+                    verbose=False,
+                )
+                self._offsets[key] = encoding["offset_mapping"]
+            else:
+                self._offsets[key] = align_offsets(self.text, tokenizer.tokenize(self.text))
+        return self._offsets[key]
+
+    def token_count(self, tokenizer):
+        return len(self.offsets(tokenizer))
+
+    def chunks(self, tokenizer, max_tokens=MAX_TOKENS, whole_words=False):
+        """
+        Splits the text into spans of at most max_tokens tokens. With whole_words,
+        a span ends before the word that would overflow it, unless that single word
+        is longer than max_tokens on its own.
+        """
+        key = (tokenizer_key(tokenizer), max_tokens, whole_words)
+        if key not in self._chunks:
+            self._chunks[key] = self._split(self.offsets(tokenizer), max_tokens, whole_words)
+        return self._chunks[key]
+
+    def _split(self, offsets, max_tokens, whole_words):
+        word_start = word_starts(offsets)
+        chunks, begin = [], 0
+        while begin < len(offsets):
+            end = min(begin + max_tokens, len(offsets))
+            if whole_words and end < len(offsets):
+                end = word_cut(word_start, begin, end)
+            chunk = self._span_text(offsets, begin, end)
+            if chunk:
+                chunks.append(chunk)
+            begin = end
+        return chunks
+
+    def pack(self, tokenizer, max_length=None, stride=0, also_fit=()):
+        """
+        Splits the text into chunks of whole sentences, each filled as close as it gets
+        to max_length tokens (default: the tokenizer's model limit) once the special
+        tokens are added, so the model sees everything without truncating. A sentence
+        longer than that is split on word boundaries. With stride > 0, each chunk starts
+        with the previous chunk's last sentences, up to stride tokens of them.
+        Chunks also stay within the model limit of every tokenizer in also_fit, for
+        models that score the same chunks (ensemble members, cascade stages).
+        """
+        budget = (max_length or model_max_length(tokenizer)) - tokenizer.num_special_tokens_to_add(pair=False)
+        others = [
+            (other, model_max_length(other) - other.num_special_tokens_to_add(pair=False))
+            for other in also_fit if tokenizer_key(other) != tokenizer_key(tokenizer)
+        ]
+        key = ("pack", tokenizer_key(tokenizer), budget, stride, *((tokenizer_key(o), b) for o, b in others))
+        if key not in self._chunks:
+            offsets = self.offsets(tokenizer)
+            self._chunks[key] = self._pack(offsets, budget, stride, self._fits(offsets, budget, others))
+        return self._chunks[key]
+
+    def _fits(self, offsets, budget, others):
+        """fits(begin, end): whether tokens [begin, end) stay within budget, and their text within every other budget."""
+        if not others:
+            return lambda begin, end: end - begin <= budget
+        # Tokens overlapping a span: SentencePiece offsets can begin at the space before a word
+        bounds = [
+            ([start for start, _ in self.offsets(other)], [end for _, end in self.offsets(other)], other_budget)
+            for other, other_budget in others
+        ]
+
+        def fits(begin, end):
+            if end - begin > budget:
+                return False
+            first, last = offsets[begin][0], offsets[end - 1][1]
+            return all(
+                bisect.bisect_left(starts, last) - bisect.bisect_right(ends, first) <= other_budget
+                for starts, ends, other_budget in bounds
+            )
+
+        return fits
+
+    def _sentences(self, offsets):
+        """(begin, end) token ranges of the sentences, covering every token."""
+        breaks = [match.end() for match in SENTENCE_BREAK.finditer(self.text)]
+        spans, begin, b = [], 0, 0
+        for i, (start, _) in enumerate(offsets):
+            if b < len(breaks) and start >= breaks[b]:
+                if i > begin:
+                    spans.append((begin, i))
+                    begin = i
+                while b < len(breaks) and breaks[b] <= start:
+                    b += 1
+        if begin < len(offsets):
+            spans.append((begin, len(offsets)))
+        return spans
+
+    def _pack(self, offsets, budget, stride, fits):
+        word_start = word_starts(offsets)
+        pieces = []
+        for begin, end in self._sentences(offsets):
+            while not fits(begin, end):
+                # Longest run from begin that fits; at least one token, so the split always advances
+                low, high = begin + 1, min(begin + budget, end)
+                while low < high:
+                    middle = (low + high + 1) // 2
+                    low, high = (middle, high) if fits(begin, middle) else (low, middle - 1)
+                cut = word_cut(word_start, begin, low)
+                pieces.append((begin, cut))
+                begin = cut
+            pieces.append((begin, end))
+
+        chunks, first = [], 0
+        while first < len(pieces):
+            begin, last = pieces[first][0], first
+            while last + 1 < len(pieces) and fits(begin, pieces[last + 1][1]):
+                last += 1
+            chunk = self._span_text(offsets, begin, pieces[last][1])
+            if chunk:
+                chunks.append(chunk)
+            # Carry trailing sentences over as long as they fit in the stride and leave room for new text
+            following = last + 1
+            while (
+                stride and following < len(pieces) and following - 1 > first
+                and pieces[last][1] - pieces[following - 1][0] <= stride
+                and fits(pieces[following - 1][0], pieces[last + 1][1])
+            ):
+                following -= 1
+            first = following
+        return chunks
+
+    def _span_text(self, offsets, begin, end):
+        return self.text[offsets[begin][0]:offsets[end - 1][1]].strip()
+
+def as_document(text):
+    return text if isinstance(text, Document) else Document(text)
@@ -0,0 +1,90 @@
+# ensemble.py
+# Runs several bias models over the same chunks at once and combines them with
+# confidence-weighted voting on a shared left / center / right scale.
+
+from concurrent.futures import ThreadPoolExecutor
+from config import ENSEMBLE_MODELS
+from inference import cached_predict_proba
+from model_registry import BIAS_MODELS, registry
+
+COMMON_LABELS = ["left", "center", "right"]
+
+# Where each model label lands on the common scale, and its leaning in [-1, 1]
+LABEL_TO_COMMON = {"left": "left", "lean left": "left", "center": "center", "lean right": "right", "right": "right"}
+LEANING = {"left": -1.0, "lean left": -0.5, "center": 0.0, "lean right": 0.5, "right": 1.0}
+
+
+def to_common(model_name, scores):
+    """Folds one model's class probabilities onto COMMON_LABELS (5-class "lean" labels join their side)."""
+    common = dict.fromkeys(COMMON_LABELS, 0.0)
+    for label, score in zip(BIAS_MODELS[model_name]["labels"], scores):
+        common[LABEL_TO_COMMON[label]] += float(score)
+    return common
+
+
+def leaning(model_name, scores):
+    return sum(LEANING[label] * float(score) for label, score in zip(BIAS_MODELS[model_name]["labels"], scores))
+
+
+def score_chunks(model_name, chunks):
+    return cached_predict_proba(registry.cache_key(model_name), lambda: registry.get(model_name), chunks)
+
+
+# ⚖️ Ensemble bias analysis
+def analyze_bias_ensemble(chunks, sentiment_results=None, model_names=ENSEMBLE_MODELS):
+    print(f"🔍 Evaluating political leaning with an ensemble of {len(model_names)} models...")
+
+    # Torch releases the GIL inside forward passes, so threads are enough to overlap the models
+    with ThreadPoolExecutor(max_workers=len(model_names)) as pool:
+        futures = {name: pool.submit(score_chunks, name, chunks) for name in model_names}
+        per_model = {name: future.result() for name, future in futures.items()}
+
+    results = []
+    bias_totals = dict.fromkeys(COMMON_LABELS, 0.0)
+    model_votes = {name: dict.fromkeys(COMMON_LABELS, 0) for name in model_names}
+
+    for index, chunk in enumerate(chunks):
+        # Each model votes with its folded distribution, weighted by how sure it is
+        votes = dict.fromkeys(COMMON_LABELS, 0.0)
+        chunk_leaning, weight_sum = 0.0, 0.0
+        for name in model_names:
+            scores = per_model[name][index]
+            common = to_common(name, scores)
+            weight = float(scores.max())
+            for label, score in common.items():
+                votes[label] += weight * score
+            chunk_leaning += weight * leaning(name, scores)
+            weight_sum += weight
+            model_votes[name][max(common, key=common.get)] += 1
+
+        pred_label = max(votes, key=votes.get)
+        confidence = votes[pred_label] / weight_sum
+        results.append({
+            "chunk": chunk,
+            "bias": pred_label,
+            "confidence": confidence,
+            "leaning": chunk_leaning / weight_sum,
+        })
+        bias_totals[pred_label] += confidence
+
+    # 📈 Overall prediction: chunk labels weighted by ensemble confidence
+    bias_overall = max(bias_totals, key=bias_totals.get) if results else "center"
+    bias_score = sum(r["leaning"] for r in results) / len(results) if results else 0.0
+    remarks = (
+        f"Text shows a tendency towards **{bias_overall.upper()}** leaning "
+        f"(ensemble of {len(model_names)} models, leaning score {bias_score:+.2f})."
+    )
+
+    # 🔎 Highlight bias lines
+    highlighted_bias_lines = [
+        f"[{r['bias'].upper()} | {round(r['confidence']*100, 1)}%] {r['chunk'][:100]}..."
+        for r in results if r['bias'] != "center"
+    ]
+
+    return {
+        "bias_overall": bias_overall,
+        "bias_score": round(bias_score, 4),
+        "model_votes": model_votes,
+        "remarks": remarks,
+        "highlighted_bias_lines": highlighted_bias_lines
+    }
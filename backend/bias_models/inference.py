@@ -0,0 +1,109 @@
+# inference.py
+
+import hashlib
+import os
+from document import model_max_length
+from config import DEVICE, BIAS_BATCH_SIZE, INFERENCE_BACKEND, ONNX_MODELS_DIR, MICRO_BATCHING
+from inference_cache import get_inference_cache
+from micro_batcher import get_batcher
+
+BACKENDS = ("torch", "quantized", "onnx")
+
+
+def apply_backend(model, source, backend=INFERENCE_BACKEND):
+    """
+    Returns the classifier to run for the configured backend. `source` is the Hub id
+    or local directory the fp32 model came from; ONNX graphs are exported from it once
+    and cached under ONNX_MODELS_DIR.
+    """
+    if backend == "torch":
+        return model
+    if backend == "quantized":
+        import torch
+
+        # int8 weights for every Linear layer, activations quantized on the fly
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        onnx_dir = os.path.join(ONNX_MODELS_DIR, source.strip("./").replace("/", "_"))
+        if os.path.exists(onnx_dir):
+            return ORTModelForSequenceClassification.from_pretrained(onnx_dir)
+        print(f"📤 Exporting {source} to ONNX...")
+        ort_model = ORTModelForSequenceClassification.from_pretrained(source, export=True)
+        ort_model.save_pretrained(onnx_dir)
+        return ort_model
+    raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+
+def predict_proba(tokenizer, model, chunks, batch_size=BIAS_BATCH_SIZE):
+    """
+    Returns softmax scores (one row per chunk, in input order) from batched forward passes.
+    Chunks are sorted by token length first so each batch pads as little as possible;
+    batch_size=1 reproduces the old one-chunk-at-a-time path. Chunks longer than the
+    model accepts are truncated, and how many tokens that dropped is reported.
+    """
+    if not chunks:
+        return []
+    import torch
+
+    # Tokenize once without padding; batches are padded to their own longest chunk
+    encoded = tokenizer(list(chunks), verbose=False)
+    limit = model_max_length(tokenizer)
+    overlong = [i for i, ids in enumerate(encoded["input_ids"]) if len(ids) > limit]
+    if overlong:
+        dropped = sum(len(encoded["input_ids"][i]) - limit for i in overlong)
+        print(f"✂️ {len(overlong)} of {len(chunks)} chunks exceed {tokenizer.name_or_path}'s {limit} tokens; truncating {dropped} tokens")
+        truncated = tokenizer([chunks[i] for i in overlong], truncation=True, max_length=limit)
+        for row, i in enumerate(overlong):
+            for key in encoded.keys():
+                encoded[key][i] = truncated[key][row]
+    order = sorted(range(len(chunks)), key=lambda i: len(encoded["input_ids"][i]))
+
+    scores = [None] * len(chunks)
+    for start in range(0, len(order), batch_size):
+        batch_idx = order[start:start + batch_size]
+        features = [{key: encoded[key][i] for key in encoded.keys()} for i in batch_idx]
+        inputs = tokenizer.pad(features, padding=True, return_tensors="pt").to(DEVICE)
+        with torch.no_grad():
+            outputs = model(**inputs)
+        probs = torch.nn.functional.softmax(outputs.logits, dim=1).cpu().numpy()
+        for i, row in zip(batch_idx, probs):
+            scores[i] = row
+    return scores
+
+
+def model_revision(path):
+    """Fingerprint of a local model directory (file names, sizes and mtimes), so re-downloaded weights get new cache keys."""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        stat = os.stat(os.path.join(path, name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def run_model(model_key, load, chunks, batch_size=BIAS_BATCH_SIZE):
+    """predict_proba, coalesced with other threads' chunks by the model's micro-batcher when MICRO_BATCHING is on."""
+    if MICRO_BATCHING:
+        batcher = get_batcher(model_key, lambda: lambda items: predict_proba(*load(), items, batch_size))
+        return batcher(chunks)
+    tokenizer, model = load()
+    return predict_proba(tokenizer, model, chunks, batch_size)
+
+
+def cached_predict_proba(model_key, load, chunks, batch_size=BIAS_BATCH_SIZE):
+    """
+    predict_proba with the on-disk inference cache in front of it. `load` returns
+    (tokenizer, model) and is only called when some chunk is not cached yet.
+    """
+    inference_cache = get_inference_cache()
+    if inference_cache is None:
+        return run_model(model_key, load, chunks, batch_size)
+
+    found = inference_cache.get_many(model_key, chunks)
+    missing = [chunk for chunk in dict.fromkeys(chunks) if chunk not in found]
+    if missing:
+        computed = run_model(model_key, load, missing, batch_size)
+        inference_cache.put_many(model_key, zip(missing, computed))
+        found.update(zip(missing, computed))
+    return [found[chunk] for chunk in chunks]
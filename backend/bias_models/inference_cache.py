@@ -0,0 +1,152 @@
+# inference_cache.py
+# On-disk cache of chunk-level predictions, keyed by a hash of the chunk text,
+# the model name and the model revision. Wire copy, boilerplate footers and
+# re-posted stories then skip the transformer entirely.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from config import INFERENCE_CACHE_ENABLED, INFERENCE_CACHE_PATH, INFERENCE_CACHE_MAX_ENTRIES
+from instrumentation import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    key TEXT PRIMARY KEY,
+    scores BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used);
+"""
+
+# Look-ups go to SQLite in slices that stay under its bound-parameter limit
+LOOKUP_BATCH = 500
+# Hits are remembered and their last_used written in one transaction once this many pile up
+# (or with the next insert), so reads stay read-only
+TOUCH_BATCH = 500
+
+
+def chunk_key(model_key, text):
+    return hashlib.sha256(f"{model_key}\0{text}".encode("utf-8")).hexdigest()
+
+
+class InferenceCache:
+    """Size-bounded (by entry count) LRU in SQLite, shared by threads and worker processes."""
+
+    def __init__(self, path=INFERENCE_CACHE_PATH, max_entries=INFERENCE_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Counting rows scans the table, so the size is only checked after this many inserts
+        # (by this process); the cache can run over max_entries by about that much in between
+        self.eviction_interval = max(1, max_entries // 100)
+        self._inserted = 0
+        self._touched = {}  # key -> last hit time, not yet written
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, model_key, texts):
+        """Cached score vectors for the texts that have one, as {text: np.ndarray}."""
+        keys = {chunk_key(model_key, text): text for text in texts}
+        found = {}
+        hit_keys = []
+        key_list = list(keys)
+        conn = self._connection()
+        for start in range(0, len(key_list), LOOKUP_BATCH):
+            batch = key_list[start:start + LOOKUP_BATCH]
+            rows = conn.execute(
+                f"SELECT key, scores FROM predictions WHERE key IN ({', '.join('?' * len(batch))})", batch
+            ).fetchall()
+            for key, scores in rows:
+                found[keys[key]] = np.frombuffer(scores, dtype=np.float32)
+                hit_keys.append(key)
+        now = time.time()
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            self._touched.update((key, now) for key in hit_keys)
+            flush = len(self._touched) >= TOUCH_BATCH
+        if flush:
+            with conn:
+                self._write_touches(conn)
+        # Worker processes forward these to the API's /metrics
+        metrics.count("inference_cache_hits_total", len(found), model=model_key)
+        metrics.count("inference_cache_misses_total", len(keys) - len(found), model=model_key)
+        return found
+
+    def put_many(self, model_key, items):
+        """Stores (text, scores) pairs and evicts the least recently used entries over the limit."""
+        now = time.time()
+        rows = [
+            (chunk_key(model_key, text), np.asarray(scores, dtype=np.float32).tobytes(), now)
+            for text, scores in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._inserted += len(rows)
+            evict = self._inserted >= self.eviction_interval
+            if evict:
+                self._inserted = 0
+        with self._connection() as conn:
+            conn.executemany("INSERT OR REPLACE INTO predictions (key, scores, last_used) VALUES (?, ?, ?)", rows)
+            # Already in a write transaction, so pending hits are recorded for free
+            self._write_touches(conn)
+            if evict:
+                excess = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM predictions WHERE key IN "
+                        "(SELECT key FROM predictions ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    )
+
+    def _write_touches(self, conn):
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            conn.executemany("UPDATE predictions SET last_used = ? WHERE key = ?", [(t, k) for k, t in touched.items()])
+
+    def stats(self):
+        entries = self._connection().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
+_inference_cache = None
+_inference_cache_lock = threading.Lock()
+
+
+def get_inference_cache():
+    """The process-wide cache, opened on first use; None when INFERENCE_CACHE=0."""
+    global _inference_cache
+    if not INFERENCE_CACHE_ENABLED:
+        return None
+    # Ensemble threads ask for it at the same moment, and they must share one instance
+    with _inference_cache_lock:
+        if _inference_cache is None:
+            _inference_cache = InferenceCache()
+        return _inference_cache
@@ -0,0 +1,109 @@
+# micro_batcher.py
+# Coalesces inference calls from many threads into shared batches. A request
+# waits at most MICRO_BATCH_MAX_WAIT_MS for company, and a batch is sent as soon
+# as it holds MICRO_BATCH_MAX_SIZE chunks, so one caller alone is never held
+# back by more than the deadline while concurrent callers share forward passes.
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS
+from instrumentation import span
+
+
+class _Request:
+    __slots__ = ("items", "future", "enqueued")
+
+    def __init__(self, items):
+        self.items = items
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+
+class MicroBatcher:
+    def __init__(self, predict, max_batch=MICRO_BATCH_MAX_SIZE, max_wait_ms=MICRO_BATCH_MAX_WAIT_MS, name="model"):
+        """`predict` maps a list of items to a list of results of the same length."""
+        self.predict = predict
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, items):
+        """Queues `items` and returns a Future for their results, in order."""
+        request = _Request(list(items))
+        if not request.items:
+            request.future.set_result([])
+            return request.future
+        self._start()
+        self._queue.put(request)
+        return request.future
+
+    def __call__(self, items):
+        return self.submit(items).result()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"micro-batcher-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        """Blocks for one request, then gathers more until the batch is full or the first one's deadline passes."""
+        batch = [self._queue.get()]
+        size = len(batch[0].items)
+        deadline = batch[0].enqueued + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                # Past the deadline (e.g. after queueing behind the previous batch), still take what is waiting
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.items)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for request in batch for item in request.items]
+            try:
+                # items / count of this stage in /metrics is the mean coalesced batch size
+                with span("micro_batch", items=len(items), model=self.name, requests=len(batch)):
+                    outputs = self.predict(items)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(items)
+            start = 0
+            for request in batch:
+                end = start + len(request.items)
+                request.future.set_result(outputs[start:end])
+                start = end
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(key, make_predict):
+    """The process-wide batcher for `key`; `make_predict()` builds its predict function on first use."""
+    with _batchers_lock:
+        if key not in _batchers:
+            _batchers[key] = MicroBatcher(make_predict(), name=key)
+        return _batchers[key]
@@ -0,0 +1,131 @@
+# model_registry.py
+# Keeps bias models loaded across calls and evicts the least recently used
+# ones when their weights no longer fit in MODEL_MEMORY_BUDGET_MB.
+
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from config import DEVICE, HUGGINGFACE_TOKEN, MODEL_MEMORY_BUDGET_MB, INFERENCE_BACKEND
+from inference import apply_backend, model_revision
+
+# 🌐 Bias models by name: Hub id, local directory and output labels
+BIAS_MODELS = {
+    "distilbert": {
+        "hub": "cajcodes/DistilBERT-PoliticalBias",
+        "path": "./models/cajcodes_distilbert_model",
+        "labels": ["left", "center", "right"],
+    },
+    "roberta": {
+        "hub": "kangelamw/RoBERTa-political-bias-classifier-softmax",
+        "path": "./models/kangelamw_roberta_bias_model",
+        "labels": ["left", "center", "right"],
+    },
+    "mdeberta": {
+        "hub": "premsa/political-bias-prediction-allsides-mDeBERTa",
+        "path": "./models/premsa_mdeberta_bias_model",
+        "labels": ["left", "lean left", "center", "lean right", "right"],
+    },
+    "mbert": {
+        "hub": "premsa/political-bias-prediction-allsides-mBERT",
+        "path": "./models/premsa_mbert_bias_model",
+        "labels": ["left", "center", "right"],
+    },
+}
+
+
+# 🔽 Download the model if not already present
+def download_model(name):
+    spec = BIAS_MODELS[name]
+    if os.path.exists(spec["path"]):
+        return
+    print(f"⬇️ Downloading {name} bias model with authentication...")
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(spec["hub"], use_auth_token=HUGGINGFACE_TOKEN)
+    model = AutoModelForSequenceClassification.from_pretrained(spec["hub"], use_auth_token=HUGGINGFACE_TOKEN)
+    os.makedirs(spec["path"], exist_ok=True)
+    tokenizer.save_pretrained(spec["path"])
+    model.save_pretrained(spec["path"])
+    print("✅ Model downloaded and saved locally.")
+
+
+# 🧠 Load model from its local directory
+def load_model(name, backend=INFERENCE_BACKEND):
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    download_model(name)
+    path = BIAS_MODELS[name]["path"]
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    model = AutoModelForSequenceClassification.from_pretrained(path)
+    model.eval()
+    return tokenizer, apply_backend(model.to(DEVICE), path, backend)
+
+
+@lru_cache(maxsize=None)
+def load_tokenizer(name):
+    """A bias model's tokenizer alone, e.g. to size chunks for it before (or without) loading the weights."""
+    from transformers import AutoTokenizer
+
+    download_model(name)
+    return AutoTokenizer.from_pretrained(BIAS_MODELS[name]["path"])
+
+
+def _tensors(value):
+    # Quantized Linear layers keep (int8 weight, bias) tuples next to non-tensor entries such as their dtype
+    if isinstance(value, (tuple, list)):
+        for item in value:
+            yield from _tensors(item)
+    elif hasattr(value, "element_size"):
+        yield value
+
+
+def model_size_mb(model):
+    """Bytes held by the model's weights (or its ONNX graph), in MB."""
+    if not hasattr(model, "parameters"):
+        return os.path.getsize(model.model_path) / (1024 * 1024)
+    # state_dict(), unlike parameters(), includes the packed weights of dynamically quantized layers;
+    # keep_vars keeps tied weights as one object so they are counted once
+    tensors = {id(t): t for value in model.state_dict(keep_vars=True).values() for t in _tensors(value)}
+    return sum(t.numel() * t.element_size() for t in tensors.values()) / (1024 * 1024)
+
+
+class ModelRegistry:
+    def __init__(self, budget_mb=MODEL_MEMORY_BUDGET_MB):
+        self.budget_mb = budget_mb
+        self._models = OrderedDict()  # name -> (tokenizer, model, size_mb), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """Returns (tokenizer, model) for a bias model, loading it on first use."""
+        if name not in BIAS_MODELS:
+            raise ValueError(f"Unknown bias model '{name}', expected one of {sorted(BIAS_MODELS)}")
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                tokenizer, model, _ = self._models[name]
+                return tokenizer, model
+
+            tokenizer, model = load_model(name)
+            size_mb = model_size_mb(model)
+            # The requested model always stays, even if it alone is over budget
+            while self._models and self.used_mb() + size_mb > self.budget_mb:
+                evicted, _ = self._models.popitem(last=False)
+                print(f"♻️ Evicted {evicted} bias model to stay under {self.budget_mb} MB")
+            self._models[name] = (tokenizer, model, size_mb)
+            print(f"📦 Loaded {name} bias model ({size_mb:.0f} MB)")
+            return tokenizer, model
+
+    def cache_key(self, name):
+        """Inference-cache key for a model: name, revision of its local weights and backend."""
+        download_model(name)
+        return f"{name}@{model_revision(BIAS_MODELS[name]['path'])}/{INFERENCE_BACKEND}"
+
+    def used_mb(self):
+        return sum(size_mb for _, _, size_mb in self._models.values())
+
+    def loaded(self):
+        return list(self._models)
+
+
+registry = ModelRegistry()
@@ -1,61 +1,135 @@
 # sentiment_emotion.py
 
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
-from config import SENTIMENT_MODEL, MAX_TOKENS
-import torch
-
-# 👟 Load tokenizer & model once
-tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
-model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL)
-
-# 🚀 Build a pipeline that returns all scores
-emotion_pipe = pipeline(
-    "text-classification",
-    model=model,
-    tokenizer=tokenizer,
-    return_all_scores=True,
-    device=0 if torch.cuda.is_available() else -1
-)
-
-def chunk_text(text: str, max_tokens: int = MAX_TOKENS) -> list[str]:
-    """
-    Splits `text` into chunks of <= max_tokens WordPiece tokens.
-    """
-    # Tokenize entire text to tokens
-    tokens = tokenizer.tokenize(text)
-    chunks = []
-    for i in range(0, len(tokens), max_tokens):
-        token_slice = tokens[i : i + max_tokens]
-        chunk = tokenizer.convert_tokens_to_string(token_slice)
-        chunks.append(chunk)
-    return chunks
-
-def analyze_sentiment_emotion(text: str) -> list[dict]:
+import os
+from functools import lru_cache
+import numpy as np
+from config import SENTIMENT_MODEL, CHUNK_STRIDE, INFERENCE_BACKEND, EMOTION_BATCH_SIZE, MICRO_BATCHING
+from document import as_document
+from inference import apply_backend, model_revision
+from inference_cache import get_inference_cache
+from micro_batcher import get_batcher
+
+# 👟 Everything below loads on first use, not at import
+
+@lru_cache(maxsize=None)
+def get_tokenizer():
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+
+@lru_cache(maxsize=None)
+def get_model_info():
+    """(labels in output order, inference-cache key) from the model config alone, without loading weights."""
+    from transformers import AutoConfig
+
+    config = AutoConfig.from_pretrained(SENTIMENT_MODEL)
+    labels = [config.id2label[i] for i in range(len(config.id2label))]
+    if os.path.isdir(SENTIMENT_MODEL):
+        # Like ModelRegistry.cache_key: replaced weights in the directory get a new key
+        revision = model_revision(SENTIMENT_MODEL)
+    else:
+        revision = getattr(config, "_commit_hash", None) or "unknown"
+    cache_key = f"{SENTIMENT_MODEL}@{revision}/{INFERENCE_BACKEND}"
+    return labels, cache_key
+
+@lru_cache(maxsize=None)
+def get_emotion_pipe():
+    import torch
+    from transformers import AutoModelForSequenceClassification, pipeline
+
+    model = apply_backend(AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL).eval(), SENTIMENT_MODEL)
+    # 🚀 Build a pipeline that returns all scores
+    return pipeline(
+        "text-classification",
+        model=model,
+        tokenizer=get_tokenizer(),
+        return_all_scores=True,
+        device=0 if torch.cuda.is_available() else -1
+    )
+
+def chunk_text(text, stride: int = CHUNK_STRIDE, max_length: int | None = None) -> list[str]:
     """
-    Analyzes emotions chunk by chunk and returns top emotion + score.
+    Packs `text` (a str or Document) into whole-sentence chunks that fill the emotion model's input length
+    (or max_length tokens).
+    """
+    return as_document(text).pack(get_tokenizer(), max_length=max_length, stride=stride)
+
+def score_chunks(chunks, labels, batch_size: int = EMOTION_BATCH_SIZE) -> dict:
+    """
+    Full emotion score vector (in `labels` order) for every chunk it could score,
+    from batched pipeline calls. A failing batch falls back to one chunk at a time.
+    """
+    pipe = get_emotion_pipe()
+    scores = {}
+
+    def keep(chunk, all_scores):
+        by_label = {s["label"]: s["score"] for s in all_scores}
+        scores[chunk] = [by_label[label] for label in labels]
+
+    def run_batch(items):
+        return pipe(items, batch_size=batch_size)
+
+    # With MICRO_BATCHING, pipeline passes are shared with chunks from other threads
+    score_batch = get_batcher(get_model_info()[1], lambda: run_batch) if MICRO_BATCHING else run_batch
+
+    try:
+        # Returns one [{label,score},...] list per chunk
+        for chunk, all_scores in zip(chunks, score_batch(chunks)):
+            keep(chunk, all_scores)
+    except Exception as e:
+        print(f"❌ Batched emotion scoring failed, retrying chunk by chunk: {e}")
+        for idx, chunk in enumerate(chunks):
+            try:
+                keep(chunk, pipe(chunk)[0])
+            except Exception as e:
+                print(f"❌ Error on chunk {idx}: {e}")
+    return scores
+
+def analyze_emotions(text, batch_size: int = EMOTION_BATCH_SIZE, max_length: int | None = None) -> tuple[list[dict], dict]:
+    """
+    Scores every chunk and returns (per-chunk top emotion + score, document-level
+    emotion distribution). The distribution averages the full per-chunk score
+    vectors weighted by chunk length, so long chunks count for more.
     """
-    results = []
     # 1️⃣ Chunk input safely
-    chunks = chunk_text(text)
+    chunks = chunk_text(text, max_length=max_length)
+    labels, cache_key = get_model_info()
+    inference_cache = get_inference_cache()
+    scores = inference_cache.get_many(cache_key, chunks) if inference_cache else {}
 
-    # 2️⃣ Process each chunk
+    # 2️⃣ Score the chunks the cache did not have, in batches
+    missing = [chunk for chunk in dict.fromkeys(chunks) if chunk not in scores]
+    if missing:
+        computed = score_chunks(missing, labels, batch_size)
+        if inference_cache and computed:
+            inference_cache.put_many(cache_key, computed.items())
+        scores.update(computed)
+
+    results = []
     for idx, chunk in enumerate(chunks):
-        try:
-            # Returns list of lists: [[{label,score},...]]
-            all_scores = emotion_pipe(chunk)[0]
-            # Pick the label with highest score
-            top = max(all_scores, key=lambda x: x["score"])
-            results.append({
-                "chunk_index": idx,
-                "emotion": top["label"],
-                "confidence": round(top["score"], 4)
-            })
-        except Exception as e:
-            print(f"❌ Error on chunk {idx}: {e}")
-            results.append({
-                "chunk_index": idx,
-                "emotion": "error",
-                "confidence": 0.0
-            })
+        if chunk not in scores:
+            results.append({"chunk_index": idx, "emotion": "error", "confidence": 0.0})
+            continue
+        # Pick the label with highest score
+        top = int(np.argmax(scores[chunk]))
+        results.append({
+            "chunk_index": idx,
+            "emotion": labels[top],
+            "confidence": round(float(scores[chunk][top]), 4)
+        })
+
+    # 3️⃣ Length-weighted document distribution over the chunks that were scored
+    scored = [chunk for chunk in chunks if chunk in scores]
+    if not scored:
+        return results, {}
+    matrix = np.asarray([scores[chunk] for chunk in scored], dtype=np.float64)
+    weights = np.fromiter((len(chunk) for chunk in scored), dtype=np.float64, count=len(scored))
+    distribution = weights @ matrix / weights.sum()
+    return results, {label: round(float(p), 4) for label, p in zip(labels, distribution)}
 
+def analyze_sentiment_emotion(text, batch_size: int = EMOTION_BATCH_SIZE, max_length: int | None = None) -> list[dict]:
+    """
+    Analyzes emotions chunk by chunk and returns top emotion + score.
+    """
+    results, _ = analyze_emotions(text, batch_size, max_length)
     return results
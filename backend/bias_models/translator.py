@@ -1,44 +1,97 @@
 # translator.py
 
-from transformers import pipeline, AutoTokenizer
-from config import TRANSLATOR_MODEL, MAX_TOKENS
-import torch
-
-# 🛠 Load translation pipeline locally
-translator = pipeline(
-    "translation",
-    model=TRANSLATOR_MODEL,
-    tokenizer=TRANSLATOR_MODEL,
-    device=0 if torch.cuda.is_available() else -1
+from functools import lru_cache
+from config import (
+    TARGET_LANG, TRANSLATOR_MODEL, MAX_TOKENS, TRANSLATION_MODELS, OPUS_MT_MODEL, FALLBACK_TRANSLATOR_MODEL,
+    TRANSLATION_BATCH_SIZE, TRANSLATOR_CACHE_SIZE, MAX_TRANSLATION_LENGTH, TRANSLATION_LENGTH_RATIO,
 )
+from document import as_document
+from language_utils import detect_language
 
-# Load tokenizer to chunk
-tokenizer = AutoTokenizer.from_pretrained(TRANSLATOR_MODEL)
+# 🛠 Translation pipelines are only built once a chunk in their language needs one;
+# the most recently used TRANSLATOR_CACHE_SIZE stay loaded
+@lru_cache(maxsize=TRANSLATOR_CACHE_SIZE)
+def get_translator(model_name):
+    import torch
+    from transformers import pipeline
 
-def chunk_text_for_translation(text: str, max_tokens: int = MAX_TOKENS) -> list[str]:
+    return pipeline(
+        "translation",
+        model=model_name,
+        tokenizer=model_name,
+        device=0 if torch.cuda.is_available() else -1
+    )
+
+# Tokenizer to chunk
+@lru_cache(maxsize=None)
+def get_tokenizer():
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(TRANSLATOR_MODEL)
+
+def chunk_text_for_translation(text, max_tokens: int = MAX_TOKENS) -> list[str]:
     """
-    Splits text into sub-strings of <= max_tokens tokens for translation.
+    Splits text (a str or Document) into sub-strings of <= max_tokens tokens for translation.
     """
-    tokens = tokenizer.tokenize(text)
-    chunks = []
-    for i in range(0, len(tokens), max_tokens):
-        tok_slice = tokens[i : i + max_tokens]
-        chunk = tokenizer.convert_tokens_to_string(tok_slice)
-        chunks.append(chunk)
-    return chunks
-
-def translate_chunks(chunks: list[str]) -> list[str]:
+    return as_document(text).chunks(get_tokenizer(), max_tokens)
+
+# opus-mt models that turned out not to exist, so they are not looked up again
+_missing_models = set()
+
+def translation_route(lang):
+    """(pipeline, extra call kwargs) translating `lang` to English; m2m100 covers languages without an opus-mt model."""
+    model_name = TRANSLATION_MODELS.get(lang, OPUS_MT_MODEL.format(lang=lang))
+    if model_name not in _missing_models:
+        try:
+            return get_translator(model_name), {}
+        except OSError:
+            print(f"↪️ No {model_name}, using {FALLBACK_TRANSLATOR_MODEL} for '{lang}'")
+            _missing_models.add(model_name)
+    return get_translator(FALLBACK_TRANSLATOR_MODEL), {"src_lang": lang, "tgt_lang": TARGET_LANG}
+
+def translate_batch(translator, chunks, kwargs):
+    """Translates equally long-ish chunks in one pass, with the output length capped relative to the longest input."""
+    lengths = [len(ids) for ids in translator.tokenizer(chunks)["input_ids"]]
+    # max_new_tokens, not max_length: the pipeline's own max_new_tokens default (256) would win over max_length
+    max_new_tokens = min(MAX_TRANSLATION_LENGTH, int(max(lengths) * TRANSLATION_LENGTH_RATIO) + 16)
+    outputs = translator(chunks, max_new_tokens=max_new_tokens, batch_size=len(chunks), **kwargs)
+    return [out["translation_text"] for out in outputs]
+
+def translate_chunks(
+    chunks: list[str], source_lang: str | None = None, batch_size: int = TRANSLATION_BATCH_SIZE
+) -> list[str]:
     """
-    Translates a list of English/Hindi text chunks to English locally.
+    Translates a list of text chunks to English locally. Each chunk is routed by its own
+    detected language (falling back to `source_lang`, the document language), so mixed
+    feeds work; English chunks are kept as they are. Chunks of one language are sorted by
+    length and translated in batches.
     """
-    translated = []
+    translated = list(chunks)
+    by_lang = {}
     for idx, chunk in enumerate(chunks):
-        print(f"🌐 Translating chunk {idx+1}/{len(chunks)} locally...")
+        lang = detect_language(chunk)
+        if lang == "unknown":
+            lang = source_lang or "unknown"
+        lang = lang.split("-")[0].lower()  # langdetect reports e.g. zh-cn
+        if lang not in (TARGET_LANG, "unknown"):
+            by_lang.setdefault(lang, []).append(idx)
+
+    for lang, indexes in by_lang.items():
+        print(f"🌐 Translating {len(indexes)} '{lang}' chunk(s) locally...")
         try:
-            # Use pipeline to translate
-            out = translator(chunk, max_length=1000)[0]
-            translated.append(out["translation_text"])
+            translator, kwargs = translation_route(lang)
         except Exception as e:
-            print(f"❌ Translation failed for chunk {idx}: {e}")
-            translated.append(chunk)
+            print(f"❌ No translation model for '{lang}': {e}")
+            continue
+        # Similar lengths in a batch keep padding (and max_length) small
+        indexes = sorted(indexes, key=lambda i: len(chunks[i]))
+        for start in range(0, len(indexes), batch_size):
+            bucket = indexes[start:start + batch_size]
+            try:
+                outputs = translate_batch(translator, [chunks[i] for i in bucket], kwargs)
+            except Exception as e:
+                print(f"❌ Translation failed for chunks {bucket}: {e}")
+                continue
+            for i, text in zip(bucket, outputs):
+                translated[i] = text
     return translated
@@ -0,0 +1,193 @@
+# dedup.py
+
+import hashlib
+import os
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+from models import Article
+
+# 🔧 Settings
+DEDUP_POLICY = os.getenv("DEDUP_POLICY", "merge").lower()  # "merge", "reject" or "off"
+# Max differing SimHash bits for two articles to count as near-duplicates. Up to
+# SIMHASH_BANDS - 1 every match is guaranteed to be found; above that it is best effort.
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
+
+# Shorter texts (bare headlines) collide too easily to fingerprint
+MIN_FINGERPRINT_TOKENS = 20
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid", "ito"}
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a link so trivially different URLs of one story compare equal."""
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        # Unparseable (e.g. "http://[bad" or a non-numeric port): only exact repeats match
+        return url.strip().lower()
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and not (scheme, port) in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    # http and https point at the same story, so the scheme is dropped from the key
+    return urlunsplit(("", host, path, urlencode(query), "")).lstrip("/")
+
+
+# Odd 64-bit constants: rotations and splitmix64's finalizer turn three token hashes into one shingle hash
+SHINGLE_ROTATIONS = (0, 21, 42)
+MIX_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+
+def _rotl(values: np.ndarray, bits: int) -> np.ndarray:
+    if not bits:
+        return values
+    return (values << np.uint64(bits)) | (values >> np.uint64(SIMHASH_BITS - bits))
+
+
+def simhash_tokens(tokens: List[str]) -> int:
+    """64-bit SimHash over word 3-shingles of `tokens`; similar texts differ in few bits.
+
+    Only distinct tokens go through blake2b; shingle hashes and the per-bit
+    majority vote are vectorized, so the cost is nearly flat in text length.
+    """
+    if not tokens:
+        return 0
+    vocabulary = {token: i for i, token in enumerate(dict.fromkeys(tokens))}
+    ids = list(map(vocabulary.__getitem__, tokens))
+    digests = b"".join(hashlib.blake2b(token.encode(), digest_size=8).digest() for token in vocabulary)
+    hashes = np.frombuffer(digests, dtype="<u8")[ids]
+    if len(hashes) < 3:
+        hashes = np.concatenate([hashes, np.zeros(3 - len(hashes), dtype=np.uint64)])
+    count = len(hashes) - 2
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset, bits in enumerate(SHINGLE_ROTATIONS):
+        shingles ^= _rotl(hashes[offset:offset + count], bits)
+    shingles ^= shingles >> np.uint64(30)
+    shingles *= MIX_MULTIPLIERS[0]
+    shingles ^= shingles >> np.uint64(27)
+    shingles *= MIX_MULTIPLIERS[1]
+    shingles ^= shingles >> np.uint64(31)
+    # One row of 64 bits per shingle (column i is bit i); a bit is set when most shingles have it set
+    bits = np.unpackbits(shingles.view(np.uint8).reshape(count, 8), axis=1, bitorder="little")
+    majority = 2 * bits.sum(axis=0, dtype=np.int64) > count
+    return int.from_bytes(np.packbits(majority, bitorder="little").tobytes(), "little")
+
+
+def simhash(text: str) -> int:
+    return simhash_tokens(TOKEN_RE.findall(text.lower()))
+
+
+def article_fingerprint(article: Article) -> int | None:
+    tokens = TOKEN_RE.findall(f"{article.title}\n{article.text or article.summary or ''}".lower())
+    if len(tokens) < MIN_FINGERPRINT_TOKENS:
+        return None
+    return simhash_tokens(tokens)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def bands(fingerprint: int) -> List[int]:
+    # Two fingerprints within SIMHASH_BANDS - 1 bits must agree on at least one band
+    return [fingerprint >> (i * BAND_BITS) & BAND_MASK for i in range(SIMHASH_BANDS)]
+
+
+def to_signed(fingerprint: int) -> int:
+    # SQLite integers are signed 64-bit
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class SimHashIndex:
+    """In-memory banded index: candidates come from band buckets, not a full scan."""
+
+    def __init__(self):
+        self._fingerprints: Dict[str, int] = {}
+        self._buckets: List[Dict[int, Set[str]]] = [{} for _ in range(SIMHASH_BANDS)]
+
+    def add(self, key: str, fingerprint: int) -> None:
+        self.remove(key)
+        self._fingerprints[key] = fingerprint
+        for bucket, band in zip(self._buckets, bands(fingerprint)):
+            bucket.setdefault(band, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        for bucket, band in zip(self._buckets, bands(fingerprint)):
+            bucket[band].discard(key)
+            if not bucket[band]:
+                del bucket[band]
+
+    def find(self, fingerprint: int, max_distance: int) -> List[Tuple[int, str]]:
+        """Returns (distance, key) pairs within `max_distance`, closest first."""
+        candidates: Set[str] = set()
+        for bucket, band in zip(self._buckets, bands(fingerprint)):
+            candidates |= bucket.get(band, set())
+        return sorted(
+            (distance, key)
+            for key in candidates
+            if (distance := hamming(fingerprint, self._fingerprints[key])) <= max_distance
+        )
+
+
+def find_duplicate(
+    repository, article: Article, max_distance: int = DEDUP_MAX_DISTANCE, fingerprint: int | None = None,
+) -> Article | None:
+    """Looks up a stored copy of `article`: same normalized link first, then nearest SimHash.
+
+    Pass `fingerprint` when article_fingerprint(article) is already known.
+    """
+    existing = repository.find_by_link(normalize_url(article.link))
+    if existing is not None:
+        return existing
+    if fingerprint is None:
+        fingerprint = article_fingerprint(article)
+    if fingerprint is None:
+        return None
+    matches = repository.find_similar(fingerprint, max_distance)
+    return matches[0] if matches else None
+
+
+def merge_duplicate(existing: Article, incoming: Article) -> Article | None:
+    """Copy of `existing` with gaps filled from a duplicate, or None if nothing new."""
+    updates = {
+        field: getattr(incoming, field)
+        for field in ("summary", "text", "top_image_url", "published_at")
+        if getattr(existing, field) is None and getattr(incoming, field) is not None
+    }
+    for field in ("authors", "keywords"):
+        merged = _union(getattr(existing, field), getattr(incoming, field))
+        if merged != getattr(existing, field):
+            updates[field] = merged
+    return existing.model_copy(update=updates) if updates else None
+
+
+def _union(first: Iterable[str] | None, second: Iterable[str] | None) -> List[str] | None:
+    if first is None and second is None:
+        return None
+    return list(dict.fromkeys([*(first or []), *(second or [])]))
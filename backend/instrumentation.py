@@ -0,0 +1,251 @@
+# instrumentation.py
+#
+# Spans around the pipeline stages (chunking, sentiment, translation, bias
+# inference, script generation, TTS, ...). Each finished span records its wall
+# time, item count and the process's peak RSS. It is aggregated for GET /metrics
+# and, with INSTRUMENTATION_LOG set, written as one JSON line. Plain counters
+# (e.g. inference cache hits) are kept alongside. INSTRUMENTATION=0 turns span()
+# into a shared no-op object and count() into a no-op.
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+try:
+    import resource
+except ImportError:  # not on Windows; peak memory is then left out
+    resource = None
+
+INSTRUMENTATION = os.getenv("INSTRUMENTATION", "1") == "1"
+# JSON-lines destination for finished spans: a file path, or "-" for stdout; unset logs nothing
+INSTRUMENTATION_LOG = os.getenv("INSTRUMENTATION_LOG")
+
+# HELP text of the counters passed to Metrics.count()
+COUNTER_HELP = {
+    "inference_cache_hits_total": "Chunk predictions served from the inference cache, by model cache key.",
+    "inference_cache_misses_total": "Chunk predictions the inference cache did not have, by model cache key.",
+}
+
+# Upper bounds (seconds) of the stage duration histogram
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def peak_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _Stage:
+    __slots__ = ("count", "errors", "seconds", "items", "peak_rss", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.items = 0
+        self.peak_rss = 0
+        self.buckets = [0] * len(BUCKETS)
+
+
+class Metrics:
+    """Per-stage totals of finished spans, shared by the threads of one process."""
+
+    def __init__(self):
+        self.forward = False  # set in worker processes whose spans the parent collects with drain()
+        self._stages: Dict[str, _Stage] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], int] = {}
+        self._pending: List[dict] = []
+        self._pending_counts: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], int] = {}
+        self._lock = threading.Lock()
+        self._log = None
+
+    def record(self, record: dict, log: bool = True) -> None:
+        with self._lock:
+            stage = self._stages.get(record["stage"])
+            if stage is None:
+                stage = self._stages[record["stage"]] = _Stage()
+            stage.count += 1
+            stage.errors += record.get("error") is not None
+            stage.seconds += record["seconds"]
+            stage.items += record.get("items") or 0
+            stage.peak_rss = max(stage.peak_rss, record.get("peak_rss") or 0)
+            for i, bound in enumerate(BUCKETS):
+                if record["seconds"] <= bound:
+                    stage.buckets[i] += 1
+                    break
+            if self.forward:
+                self._pending.append(record)
+            if log and INSTRUMENTATION_LOG:
+                self._write_log(record)
+
+    def count(self, name: str, amount: int = 1, **labels: str) -> None:
+        """Adds `amount` to the counter `name` (rendered as is, so end it in _total) with `labels`."""
+        if not INSTRUMENTATION or not amount:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            if self.forward:
+                self._pending_counts[key] = self._pending_counts.get(key, 0) + amount
+
+    def _write_log(self, record: dict) -> None:
+        line = json.dumps({"event": "span", **record}, ensure_ascii=False)
+        if INSTRUMENTATION_LOG == "-":
+            print(line, flush=True)
+            return
+        if self._log is None:
+            self._log = open(INSTRUMENTATION_LOG, "a", encoding="utf-8")
+        self._log.write(line + "\n")
+        self._log.flush()
+
+    def drain(self) -> List[dict]:
+        """Spans finished and counter increments made since the last drain (only kept when `forward` is set)."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            counts, self._pending_counts = self._pending_counts, {}
+        return pending + [
+            {"counter": name, "labels": dict(labels), "amount": amount} for (name, labels), amount in counts.items()
+        ]
+
+    def merge(self, records: List[dict]) -> None:
+        """Counts spans and counters a worker process drained; the worker has already logged the spans."""
+        for record in records:
+            if "counter" in record:
+                self.count(record["counter"], record["amount"], **record["labels"])
+            else:
+                self.record(record, log=False)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            stages = sorted(self._stages.items())
+            lines = [
+                "# HELP pipeline_stage_seconds Wall time of pipeline stages.",
+                "# TYPE pipeline_stage_seconds histogram",
+            ]
+            for name, stage in stages:
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stage.buckets):
+                    cumulative += count
+                    lines.append(f'pipeline_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'pipeline_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {stage.count}')
+                lines.append(f'pipeline_stage_seconds_sum{{stage="{name}"}} {stage.seconds:.6f}')
+                lines.append(f'pipeline_stage_seconds_count{{stage="{name}"}} {stage.count}')
+            lines += [
+                "# HELP pipeline_stage_errors_total Stages that raised.",
+                "# TYPE pipeline_stage_errors_total counter",
+            ]
+            lines += [f'pipeline_stage_errors_total{{stage="{name}"}} {stage.errors}' for name, stage in stages]
+            lines += [
+                "# HELP pipeline_stage_items_total Items (chunks, segments) processed by each stage.",
+                "# TYPE pipeline_stage_items_total counter",
+            ]
+            lines += [f'pipeline_stage_items_total{{stage="{name}"}} {stage.items}' for name, stage in stages]
+            lines += [
+                "# HELP pipeline_stage_peak_rss_bytes Highest process peak RSS seen at the end of each stage.",
+                "# TYPE pipeline_stage_peak_rss_bytes gauge",
+            ]
+            lines += [f'pipeline_stage_peak_rss_bytes{{stage="{name}"}} {stage.peak_rss}' for name, stage in stages]
+            counters = sorted(self._counters.items())
+        for i, ((name, labels), value) in enumerate(counters):
+            if i == 0 or counters[i - 1][0][0] != name:
+                if name in COUNTER_HELP:
+                    lines.append(f"# HELP {name} {COUNTER_HELP[name]}")
+                lines.append(f"# TYPE {name} counter")
+            rendered = ",".join(f'{label}="{_escape(text)}"' for label, text in labels)
+            lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+        peak = peak_rss_bytes()
+        if peak is not None:
+            lines += [
+                "# HELP process_peak_rss_bytes Peak resident memory of this process.",
+                "# TYPE process_peak_rss_bytes gauge",
+                f"process_peak_rss_bytes {peak}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+class Span:
+    __slots__ = ("stage", "fields", "items", "_start")
+
+    def __init__(self, stage: str, fields: Dict[str, Any]):
+        self.stage = stage
+        self.fields = fields
+        self.items = fields.pop("items", None)
+
+    def set(self, items: int | None = None, **fields: Any) -> None:
+        """Attaches the item count (e.g. chunks) and any extra fields once they are known."""
+        if items is not None:
+            self.items = items
+        self.fields.update(fields)
+
+    def __enter__(self) -> "Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        record = {
+            "stage": self.stage,
+            "seconds": round(time.perf_counter() - self._start, 6),
+            "items": self.items,
+            "peak_rss": peak_rss_bytes(),
+            "pid": os.getpid(),
+            "time": time.time(),
+            "error": exc_type.__name__ if exc_type is not None else None,
+            **self.fields,
+        }
+        metrics.record(record)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, items: int | None = None, **fields: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def record_failure(stage: str, error: BaseException, seconds: float = 0.0) -> None:
+    """Counts a failure of `stage` that no span saw end, e.g. a job whose worker process died."""
+    if not INSTRUMENTATION:
+        return
+    metrics.record({
+        "stage": stage,
+        "seconds": round(seconds, 6),
+        "items": None,
+        "peak_rss": None,
+        "pid": os.getpid(),
+        "time": time.time(),
+        "error": type(error).__name__,
+    })
+
+
+def span(stage: str, **fields: Any) -> "Span | _NoopSpan":
+    """
+    with span("translation", items=len(chunks)) as s: ...
+
+    Times the block under `stage`. Pass the item count up front or later with s.set(items=...).
+    """
+    if not INSTRUMENTATION:
+        return _NOOP
+    return Span(stage, fields)
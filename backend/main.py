@@ -1,38 +1,26 @@
 import uvicorn
-from fastapi import FastAPI, status
+from fastapi import FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import AsyncIterator, Callable, Dict, List, Literal, Set, Tuple
+import base64
 import uuid
 from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
 
-class Article(BaseModel):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4)
-    title: str
-    link: str
-    source: str
-    authors: List[str] | None = None
-    summary: str | None = None
-    text: str | None = None
-    top_image_url: str | None = None
-    keywords: List[str] | None = None
-    published_at: datetime | None = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-
-class CreateArticlePayload(BaseModel):
-    """A model for the article data coming from the RSS feed."""
-    title: str
-    link: str  # from 'url'
-    source: str
-    authors: List[str] | None = None
-    published_at: datetime | None = None  # from 'publish_date'
-    summary: str | None = None
-    text: str | None = None
-    top_image_url: str | None = None  # from 'top_image'
-    keywords: List[str] | None = None
-
-class Articles(BaseModel):
-    articles: List[Article]
+from analysis_queue import AnalysisQueue
+from compression import CompressionMiddleware
+from dedup import DEDUP_POLICY, merge_duplicate
+from instrumentation import INSTRUMENTATION, metrics
+from models import (
+    Article, ArticleAnalysis, Articles, BulkIngestResponse, BulkResult, CreateArticlePayload, SearchHit,
+    SearchResults,
+)
+from response_cache import ResponseCache
+from serialization import FAST_SERIALIZATION, dumps
+from storage import SortKey, create_repository, record_sort_key, sort_key
 
 app = FastAPI(debug=True)
 
@@ -47,25 +35,335 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
-# Using a dictionary with UUIDs as keys for efficient lookups
-memory_db: Dict[uuid.UUID, Article] = {}
+# brotli when the optional package is installed, gzip otherwise
+app.add_middleware(CompressionMiddleware)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+MAX_SEARCH_RESULTS = 100
+
+# What a news card needs; served by GET /articles?view=summary
+SUMMARY_FIELDS = {"id", "title", "link", "source", "summary", "top_image_url", "published_at"}
+BULK_BATCH_SIZE = 500  # articles per transaction during bulk ingest
+
+# Selected by ARTICLE_STORE / ARTICLE_DB_PATH, see storage.py
+repository = create_repository()
+
+# Serialized bodies of read endpoints for the current store version
+response_cache = ResponseCache()
+
+# Bias/sentiment analysis of new articles, off the request path (ANALYSIS_WORKERS=0 disables)
+analysis_queue = AnalysisQueue(repository)
+
+@app.on_event("startup")
+def resume_analysis_queue():
+    # Articles still pending were queued or running when the API last stopped
+    resumed = analysis_queue.resume()
+    if resumed:
+        print(f"🔁 Re-queued {resumed} articles left pending by the last run")
+
+@app.on_event("shutdown")
+def stop_analysis_queue():
+    analysis_queue.shutdown()
+
+def encode_cursor(key: SortKey) -> str:
+    raw = f"{key[0]!r}|{key[1]}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> SortKey:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, article_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return (float(timestamp), str(uuid.UUID(article_id)))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def resolve_projection(view: str, fields: str | None) -> Set[str] | None:
+    """Fields to serialize, or None for the full article."""
+    if fields:
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(Article.model_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        return requested | {"id"}
+    return SUMMARY_FIELDS if view == "summary" else None
+
+def stream_articles(articles: List[Article], fmt: str, projection: Set[str] | None = None):
+    # Serialize one article at a time instead of building the whole body up front
+    if fmt == "ndjson":
+        for article in articles:
+            yield article.model_dump_json(include=projection) + "\n"
+        return
+    yield "["
+    for i, article in enumerate(articles):
+        yield ("," if i else "") + article.model_dump_json(include=projection)
+    yield "]"
+
+def validator_headers(version: int, modified_at: datetime | None) -> Dict[str, str]:
+    # Every write bumps the store version, so it doubles as the ETag of any read
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    if modified_at is not None:
+        headers["Last-Modified"] = format_datetime(modified_at, usegmt=True)
+    return headers
+
+def is_not_modified(request: Request, etag: str, modified_at: datetime | None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified_at is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have whole-second precision
+        return since.tzinfo is not None and modified_at.replace(microsecond=0) <= since
+    return False
+
+def conditional_response(
+    request: Request, render: Callable[[], bytes], cache: bool = True, exists: Callable[[], bool] | None = None,
+) -> Response:
+    """Answers 304 when the client's copy is current, else serves `render()` via the cache.
+
+    Validators are store-wide, so a single-resource read passes `exists`: a missing
+    resource falls through to render() and its 404 instead of matching "*" or an old ETag.
+    """
+    version, modified_at = repository.version()
+    headers = validator_headers(version, modified_at)
+    if is_not_modified(request, headers["ETag"], modified_at) and (exists is None or exists()):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    key = (request.url.path, request.url.query)
+    body = response_cache.get(key, version) if cache else None
+    if body is None:
+        body = render()
+        if cache:
+            response_cache.put(key, version, body)
+    return Response(body, media_type="application/json", headers=headers)
+
+async def ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    # Yields (line number, line) as the body arrives, skipping blank lines
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+def describe_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors()
+    )
+
+def fetch_page(
+    cursor: str | None, limit: int, source: str | None, include_body: bool = True,
+) -> Tuple[List[Article], str | None]:
+    before = decode_cursor(cursor) if cursor else None
+    # Fetch one extra row to learn whether another page exists
+    articles = repository.page(before, limit + 1, source=source, include_body=include_body)
+    next_cursor = encode_cursor(sort_key(articles[limit - 1])) if len(articles) > limit else None
+    return articles[:limit], next_cursor
+
+def render_records(
+    cursor: str | None, limit: int, source: str | None, include_body: bool, projection: Set[str] | None,
+) -> bytes:
+    # Fast path: stored records go straight to the JSON encoder, no models in between
+    before = decode_cursor(cursor) if cursor else None
+    records = repository.page_records(before, limit + 1, source=source, include_body=include_body)
+    next_cursor = encode_cursor(record_sort_key(records[limit - 1])) if len(records) > limit else None
+    records = records[:limit]
+    if projection is not None:
+        records = [{field: value for field, value in record.items() if field in projection} for record in records]
+    return dumps({"articles": records, "next_cursor": next_cursor})
 
 @app.get("/articles", response_model=Articles)
-def get_articles():
-    return Articles(articles=list(memory_db.values()))
+def get_articles(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    source: str | None = None,
+    format: Literal["json", "ndjson", "json-array"] = "json",
+    view: Literal["full", "summary"] = "full",
+    fields: str | None = Query(None, description="Comma-separated Article fields to return"),
+):
+    projection = resolve_projection(view, fields)
+    # Bodies are stored out of line; skip loading them when they won't be sent
+    include_body = projection is None or "text" in projection
+
+    if format != "json":
+        # Streamed bodies are meant for large pages, so they skip the body cache
+        version, modified_at = repository.version()
+        headers = validator_headers(version, modified_at)
+        if is_not_modified(request, headers["ETag"], modified_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        articles, next_cursor = fetch_page(cursor, limit, source, include_body)
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+        return StreamingResponse(
+            stream_articles(articles, format, projection), media_type=media_type, headers=headers,
+        )
+
+    def render() -> bytes:
+        if FAST_SERIALIZATION:
+            return render_records(cursor, limit, source, include_body, projection)
+        articles, next_cursor = fetch_page(cursor, limit, source, include_body)
+        include = None if projection is None else {"articles": {"__all__": projection}, "next_cursor": True}
+        return Articles(articles=articles, next_cursor=next_cursor).model_dump_json(include=include).encode()
+
+    return conditional_response(request, render)
+
+# Declared before /articles/{article_id} so "search" isn't parsed as an id
+@app.get("/articles/search", response_model=SearchResults)
+def search_articles(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+):
+    def render() -> bytes:
+        hits = [SearchHit(article=article, score=score) for article, score in repository.search(q, limit)]
+        return SearchResults(query=q, results=hits).model_dump_json().encode()
+
+    return conditional_response(request, render)
 
 @app.get("/articles/{article_id}", response_model=Article)
-def get_article(article_id: uuid.UUID):
-    return memory_db.get(article_id)
+def get_article(request: Request, article_id: uuid.UUID):
+    def render() -> bytes:
+        if FAST_SERIALIZATION:
+            record = repository.get_record(article_id)
+            if record is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Article not found")
+            return dumps(record)
+        article = repository.get(article_id)
+        if article is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Article not found")
+        return article.model_dump_json().encode()
+
+    return conditional_response(request, render, exists=lambda: repository.exists(article_id))
+
+@app.get("/articles/{article_id}/analysis", response_model=ArticleAnalysis)
+def get_article_analysis(article_id: uuid.UUID):
+    analysis = repository.get_analysis(article_id)
+    if analysis is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No analysis for this article")
+    return analysis
 
 @app.post("/articles", response_model=Article, status_code=status.HTTP_201_CREATED)
-def create_article(payload: CreateArticlePayload):
+def create_article(payload: CreateArticlePayload, response: Response):
     # Use model_dump() to easily transfer data from payload to the main model
     new_article = Article(**payload.model_dump())
-    memory_db[new_article.id] = new_article
+    new_article.analysis_status = analysis_queue.initial_status(new_article)
+    if DEDUP_POLICY == "off":
+        repository.add(new_article)
+    else:
+        # Looked up and stored in one step, so two concurrent posts of a story don't both land
+        [existing] = repository.add_unique([new_article])
+        if existing is not None:
+            if DEDUP_POLICY == "reject":
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"message": "Duplicate article", "duplicate_of": str(existing.id)},
+                )
+            merged = merge_duplicate(existing, new_article)
+            if merged is not None:
+                repository.update(merged)
+            response.status_code = status.HTTP_200_OK
+            return merged or existing
+    new_article.analysis_status = analysis_queue.submit(new_article)
     return new_article
 
+def ingest_batch(batch: List[Tuple[int, Article]]) -> List[BulkResult]:
+    """Stores one batch of bulk records under DEDUP_POLICY and queues the new ones for analysis."""
+    articles = [article for _, article in batch]
+    for article in articles:
+        # Stored with the batch, so queueing costs no extra write per article
+        article.analysis_status = analysis_queue.initial_status(article)
+    try:
+        if DEDUP_POLICY == "off":
+            repository.add_many(articles)
+            duplicates = [None] * len(articles)
+        else:
+            # Checks each record against the store and the records before it, in the same transaction
+            duplicates = repository.add_unique(articles)
+    except Exception as e:
+        return [BulkResult(line=line_no, error=f"Storage error: {e}") for line_no, _ in batch]
+
+    results: List[BulkResult] = []
+    created: Dict[uuid.UUID, Article] = {}
+    merged: Dict[uuid.UUID, Article] = {}  # stored articles updated by duplicates in this batch
+    merged_lines: Dict[uuid.UUID, List[int]] = {}
+    for (line_no, article), existing in zip(batch, duplicates):
+        if existing is None:
+            created[article.id] = article
+            results.append(BulkResult(line=line_no, id=article.id))
+        elif DEDUP_POLICY == "reject":
+            results.append(BulkResult(line=line_no, duplicate_of=existing.id, error="Duplicate article"))
+        else:
+            updated = merge_duplicate(merged.get(existing.id, existing), article)
+            if updated is not None:
+                merged[existing.id] = updated
+            merged_lines.setdefault(existing.id, []).append(line_no)
+    for article_id, article in merged.items():
+        try:
+            repository.update(article)
+        except Exception as e:
+            results.extend(BulkResult(line=line_no, error=f"Storage error: {e}") for line_no in merged_lines.pop(article_id))
+            continue
+        if article_id in created:
+            created[article_id] = article
+    results.extend(
+        BulkResult(line=line_no, id=article_id, duplicate_of=article_id)
+        for article_id, lines in merged_lines.items()
+        for line_no in lines
+    )
+    for article in created.values():
+        analysis_queue.submit(article)
+    return results
+
+@app.post("/articles/bulk", response_model=BulkIngestResponse)
+async def create_articles_bulk(request: Request):
+    """Ingests an NDJSON stream of CreateArticlePayload records, one per line."""
+    results: List[BulkResult] = []
+    batch: List[Tuple[int, Article]] = []
+
+    async for line_no, line in ndjson_lines(request.stream()):
+        try:
+            payload = CreateArticlePayload.model_validate_json(line)
+        except ValidationError as e:
+            results.append(BulkResult(line=line_no, error=describe_validation_error(e)))
+            continue
+        batch.append((line_no, Article(**payload.model_dump())))
+        if len(batch) >= BULK_BATCH_SIZE:
+            # Duplicate checks, fingerprints and writes all run off the event loop, once per batch
+            results.extend(await run_in_threadpool(ingest_batch, batch))
+            batch = []
+    if batch:
+        results.extend(await run_in_threadpool(ingest_batch, batch))
+
+    results.sort(key=lambda r: r.line)
+    failed = sum(1 for r in results if r.error is not None)
+    duplicates = sum(1 for r in results if r.error is None and r.duplicate_of is not None)
+    return BulkIngestResponse(
+        created=len(results) - failed - duplicates, duplicates=duplicates, failed=failed, results=results,
+    )
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    # Pipeline stage timings from the analysis workers, in Prometheus text format
+    if not INSTRUMENTATION:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instrumentation is disabled")
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,66 @@
+# models.py
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal
+import uuid
+from datetime import datetime
+
+AnalysisStatus = Literal["pending", "done", "failed", "skipped"]
+
+class Article(BaseModel):
+    id: uuid.UUID = Field(default_factory=uuid.uuid4)
+    title: str
+    link: str
+    source: str
+    authors: List[str] | None = None
+    summary: str | None = None
+    text: str | None = None
+    top_image_url: str | None = None
+    keywords: List[str] | None = None
+    published_at: datetime | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    bias: str | None = None  # filled in by the background analysis
+    analysis_status: AnalysisStatus | None = None
+
+class CreateArticlePayload(BaseModel):
+    """A model for the article data coming from the RSS feed."""
+    title: str
+    link: str  # from 'url'
+    source: str
+    authors: List[str] | None = None
+    published_at: datetime | None = None  # from 'publish_date'
+    summary: str | None = None
+    text: str | None = None
+    top_image_url: str | None = None  # from 'top_image'
+    keywords: List[str] | None = None
+
+class Articles(BaseModel):
+    articles: List[Article]
+    next_cursor: str | None = None  # pass back as ?cursor= to fetch the next page
+
+class BulkResult(BaseModel):
+    line: int  # 1-based line number in the NDJSON body
+    id: uuid.UUID | None = None
+    duplicate_of: uuid.UUID | None = None  # set when the record matched a stored article
+    error: str | None = None
+
+class BulkIngestResponse(BaseModel):
+    created: int
+    duplicates: int  # records merged into (or matching) an existing article
+    failed: int
+    results: List[BulkResult]
+
+class SearchHit(BaseModel):
+    article: Article
+    score: float
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchHit]
+
+class ArticleAnalysis(BaseModel):
+    article_id: uuid.UUID
+    status: AnalysisStatus
+    result: Dict[str, Any] | None = None  # output of bias_models analysis.analyze_text
+    error: str | None = None
+    updated_at: datetime
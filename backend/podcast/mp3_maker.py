@@ -1,8 +1,13 @@
 import requests
 import os
+import sys
 from dotenv import load_dotenv
 from pydub import AudioSegment
 
+# Shared backend instrumentation lives one folder up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import span
+
 # --------- Load API KEY from rqmnts.env ---------
 load_dotenv("rqmnts.env")
 API_KEY = os.getenv("ELEVENLABS_API_KEY")
@@ -64,7 +69,9 @@ def create_podcast_segments(script_path=SCRIPT_FILE):
             print(f"⚠️ Skipped invalid line: {line}")
             continue
         voice_id = voice_ids[i % 2]
-        if not text_to_speech(text.strip(), voice_id, i):
+        with span("tts", chars=len(text)):
+            saved = text_to_speech(text.strip(), voice_id, i)
+        if not saved:
             return False
 
     print("✅ All audio segments generated.")
@@ -99,7 +106,8 @@ def merge_segments(output_filename=OUTPUT_FILE):
 # --------- MAIN EXECUTION ---------
 def create_podcast():
     if create_podcast_segments():
-        merge_segments()
+        with span("audio_merge"):
+            merge_segments()
 
 if __name__ == "__main__":
     create_podcast()
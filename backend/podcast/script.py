@@ -2,8 +2,13 @@
 
 import google.generativeai as genai
 import os
+import sys
 from dotenv import load_dotenv
 
+# Shared backend instrumentation lives one folder up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import span
+
 # ✅ Load custom .env file for Gemini API Key
 def load_api_key(env_path="rqmnts.env"):
     load_dotenv(dotenv_path=env_path)
@@ -89,7 +94,8 @@ def generate_full_podcast_script(input_path="input.txt", output_path="podcast_sc
     # Generate segments
     for i, chunk in enumerate(chunks):
         is_last = (i == len(chunks) - 1)
-        segment = generate_script_segment(chunk, previous_context, is_last)
+        with span("llm_script", chars=len(chunk)):
+            segment = generate_script_segment(chunk, previous_context, is_last)
         full_script += segment + "\n"
         previous_context = chunk
 
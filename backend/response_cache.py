@@ -0,0 +1,54 @@
+# response_cache.py
+
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+
+class ResponseCache:
+    """LRU cache of serialized response bodies, valid for a single store version.
+
+    Any write bumps the store version, so the first lookup after a write drops
+    everything cached for the previous version.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._version: int | None = None
+        self._lock = threading.Lock()
+
+    def _sync(self, version: int) -> None:
+        if version != self._version:
+            self._entries.clear()
+            self._size = 0
+            self._version = version
+
+    def get(self, key: Hashable, version: int) -> bytes | None:
+        with self._lock:
+            self._sync(version)
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: Hashable, version: int, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._sync(version)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._version = None
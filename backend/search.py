@@ -0,0 +1,93 @@
+# search.py
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from models import Article
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "to", "was", "were", "will", "with",
+}
+
+# Per-field term-frequency weights (title matches count most)
+FIELD_WEIGHTS = {"title": 3.0, "summary": 1.0, "text": 1.0, "keywords": 2.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def article_fields(article: Article) -> Dict[str, str]:
+    return {
+        "title": article.title,
+        "summary": article.summary or "",
+        "text": article.text or "",
+        "keywords": " ".join(article.keywords or []),
+    }
+
+
+class InvertedIndex:
+    """Incrementally maintained term -> postings index ranked with BM25."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = {}  # term -> {doc key: weighted tf}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._doc_lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, key: str, fields: Dict[str, str]) -> None:
+        frequencies: Counter = Counter()
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for token in tokenize(text):
+                frequencies[token] += weight
+        with self._lock:
+            self._remove(key)
+            for term, frequency in frequencies.items():
+                self._postings.setdefault(term, {})[key] = frequency
+            self._doc_terms[key] = list(frequencies)
+            self._doc_lengths[key] = sum(frequencies.values())
+            self._total_length += self._doc_lengths[key]
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        for term in self._doc_terms.pop(key, []):
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(key, 0.0)
+
+    def search(self, query: str, limit: int) -> List[Tuple[str, float]]:
+        """Returns (doc key, score) pairs, best first. Only postings of query terms are read."""
+        terms = set(tokenize(query))
+        # Scored under the lock: a concurrent add() would otherwise resize the postings mid-iteration
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count:
+                return []
+            average_length = self._total_length / doc_count
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, frequency in postings.items():
+                    norm = K1 * (1 - B + B * self._doc_lengths[key] / average_length)
+                    scores[key] = scores.get(key, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
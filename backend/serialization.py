@@ -0,0 +1,27 @@
+# serialization.py
+
+import json
+import os
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+# Opt-in: serialize stored records straight to JSON, skipping the Pydantic models
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "0") == "1"
+
+
+def json_datetime(value: str | None) -> str | None:
+    """An isoformat() string as Pydantic writes it in JSON: a zero UTC offset becomes "Z"."""
+    if value is not None and value.endswith("+00:00"):
+        return value[:-6] + "Z"
+    return value
+
+
+def dumps(obj: Any) -> bytes:
+    """Encodes JSON-ready data (str/int/float/bool/None, lists and dicts) to bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,735 @@
+# storage.py
+
+import bisect
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from dedup import (
+    SIMHASH_BANDS, SimHashIndex, article_fingerprint, bands, find_duplicate, hamming, normalize_url, to_signed,
+    to_unsigned,
+)
+from models import AnalysisStatus, Article, ArticleAnalysis
+from search import FIELD_WEIGHTS, InvertedIndex, article_fields, tokenize
+from serialization import json_datetime
+
+# (published_at timestamp, id) — the order every article listing is served in
+SortKey = Tuple[float, str]
+
+def published_timestamp(published: datetime | None) -> float:
+    # Articles without a publish date sort as the oldest; naive datetimes are taken as UTC
+    if published is None:
+        return float("-inf")
+    if published.tzinfo is None:
+        return published.replace(tzinfo=timezone.utc).timestamp()
+    return published.timestamp()
+
+def sort_key(article: Article) -> SortKey:
+    return (published_timestamp(article.published_at), str(article.id))
+
+def record_sort_key(record: Dict[str, Any]) -> SortKey:
+    published_at = record["published_at"]
+    return (published_timestamp(datetime.fromisoformat(published_at) if published_at else None), record["id"])
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 6)
+
+def decompress_text(blob: bytes) -> str:
+    return zlib.decompress(blob).decode("utf-8")
+
+
+class ArticleRepository(ABC):
+    """Storage interface the API handlers talk to."""
+
+    @abstractmethod
+    def add(self, article: Article) -> None:
+        ...
+
+    def add_many(self, articles: List[Article]) -> None:
+        """Stores a batch of articles; stores with transactions commit it once."""
+        for article in articles:
+            self.add(article)
+
+    @abstractmethod
+    def add_unique(self, articles: List[Article]) -> List[Article | None]:
+        """Stores each article that find_duplicate() matches to no stored one.
+
+        Returns, per article, the stored duplicate that kept it out, or None once it
+        was added. Look-up and insert are one atomic step, so concurrent posts of a
+        story (including two in the same call) store it once.
+        """
+
+    @abstractmethod
+    def get(self, article_id: uuid.UUID) -> Article | None:
+        ...
+
+    def exists(self, article_id: uuid.UUID) -> bool:
+        """Whether the article is stored; stores override this to skip loading it."""
+        return self.get(article_id) is not None
+
+    @abstractmethod
+    def update(self, article: Article) -> None:
+        """Replaces a stored article with the same id."""
+
+    @abstractmethod
+    def find_by_link(self, normalized_link: str) -> Article | None:
+        ...
+
+    @abstractmethod
+    def find_similar(self, fingerprint: int, max_distance: int) -> List[Article]:
+        """Articles whose SimHash is within `max_distance` bits, closest first."""
+
+    @abstractmethod
+    def search(self, query: str, limit: int) -> List[Tuple[Article, float]]:
+        """Full-text matches for `query` as (article, score) pairs, best first."""
+
+    @abstractmethod
+    def page(
+        self, before: SortKey | None, limit: int, source: str | None = None, include_body: bool = True,
+    ) -> List[Article]:
+        """Returns up to `limit` articles, newest first, strictly older than `before`.
+
+        With include_body=False the stored body is not loaded and `text` comes back as None.
+        """
+
+    @abstractmethod
+    def save_analysis(
+        self, article_id: uuid.UUID, status: AnalysisStatus, result: dict | None = None, error: str | None = None,
+    ) -> None:
+        """Records analysis progress; a finished result also sets the article's `bias`."""
+
+    @abstractmethod
+    def get_analysis(self, article_id: uuid.UUID) -> ArticleAnalysis | None:
+        ...
+
+    @abstractmethod
+    def pending_analysis(self) -> List[Article]:
+        """Articles still marked "pending", oldest first, e.g. queued when the API last stopped."""
+
+    def get_record(self, article_id: uuid.UUID) -> Dict[str, Any] | None:
+        """Like get(), but as a JSON-ready dict; stores override this to skip the model."""
+        article = self.get(article_id)
+        return article.model_dump(mode="json") if article else None
+
+    def page_records(
+        self, before: SortKey | None, limit: int, source: str | None = None, include_body: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Like page(), but as JSON-ready dicts; stores override this to skip the model."""
+        return [article.model_dump(mode="json") for article in self.page(before, limit, source, include_body)]
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def version(self) -> Tuple[int, datetime | None]:
+        """Store-wide change counter and the time of the last write; bumped by every write."""
+
+
+class _CompactArticle:
+    """Resident form of an Article: slotted, interned strings, body kept elsewhere."""
+
+    __slots__ = (
+        "id", "title", "link", "source", "authors", "summary",
+        "top_image_url", "keywords", "published_at", "created_at", "bias", "analysis_status",
+    )
+
+    def __init__(self, article: Article):
+        self.id = article.id
+        self.title = article.title
+        self.link = article.link
+        self.source = sys.intern(article.source)
+        self.authors = tuple(map(sys.intern, article.authors)) if article.authors is not None else None
+        self.summary = article.summary
+        self.top_image_url = article.top_image_url
+        self.keywords = tuple(map(sys.intern, article.keywords)) if article.keywords is not None else None
+        self.published_at = article.published_at
+        self.created_at = article.created_at
+        self.bias = article.bias
+        self.analysis_status = article.analysis_status
+
+    def to_article(self, text: str | None) -> Article:
+        # Values were validated on the way in, so skip re-validation
+        return Article.model_construct(
+            id=self.id,
+            title=self.title,
+            link=self.link,
+            source=self.source,
+            authors=list(self.authors) if self.authors is not None else None,
+            summary=self.summary,
+            text=text,
+            top_image_url=self.top_image_url,
+            keywords=list(self.keywords) if self.keywords is not None else None,
+            published_at=self.published_at,
+            created_at=self.created_at,
+            bias=self.bias,
+            analysis_status=self.analysis_status,
+        )
+
+
+    def to_record(self, text: str | None) -> Dict[str, Any]:
+        return {
+            "id": str(self.id),
+            "title": self.title,
+            "link": self.link,
+            "source": self.source,
+            "authors": list(self.authors) if self.authors is not None else None,
+            "summary": self.summary,
+            "text": text,
+            "top_image_url": self.top_image_url,
+            "keywords": list(self.keywords) if self.keywords is not None else None,
+            "published_at": json_datetime(self.published_at.isoformat()) if self.published_at else None,
+            "created_at": json_datetime(self.created_at.isoformat()),
+            "bias": self.bias,
+            "analysis_status": self.analysis_status,
+        }
+
+
+class MemoryArticleRepository(ArticleRepository):
+    """Process-local store; contents are lost on restart."""
+
+    def __init__(self):
+        self._articles: Dict[uuid.UUID, _CompactArticle] = {}
+        self._bodies: Dict[uuid.UUID, bytes] = {}  # zlib-compressed text, out of line
+        self._analyses: Dict[uuid.UUID, ArticleAnalysis] = {}
+        # Ascending sort keys, overall and per source, so a page is a bisect + slice
+        self._keys: List[SortKey] = []
+        self._keys_by_source: Dict[str, List[SortKey]] = {}
+        self._by_link: Dict[str, uuid.UUID] = {}
+        self._simhash = SimHashIndex()
+        self._search = InvertedIndex()
+        # Seeded from the clock so ETags from before a restart never match again
+        self._version = time.time_ns() // 1000
+        self._modified_at: datetime | None = None
+        # Reentrant: add_unique() runs find_duplicate(), which calls back into the locked look-ups
+        self._lock = threading.RLock()
+
+    def add(self, article: Article) -> None:
+        with self._lock:
+            self._index(article)
+            self._bump()
+
+    def add_many(self, articles: List[Article]) -> None:
+        with self._lock:
+            for article in articles:
+                self._index(article)
+            self._bump()
+
+    def add_unique(self, articles: List[Article]) -> List[Article | None]:
+        duplicates: List[Article | None] = []
+        with self._lock:
+            for article in articles:
+                fingerprint = article_fingerprint(article)
+                duplicate = find_duplicate(self, article, fingerprint=fingerprint)
+                if duplicate is None:
+                    self._index(article, fingerprint)
+                duplicates.append(duplicate)
+            if None in duplicates:
+                self._bump()
+        return duplicates
+
+    def _bump(self) -> None:
+        self._version += 1
+        self._modified_at = datetime.now(timezone.utc)
+
+    def _index(self, article: Article, fingerprint: int | None = None) -> None:
+        key = sort_key(article)
+        self._articles[article.id] = _CompactArticle(article)
+        if article.text is not None:
+            self._bodies[article.id] = compress_text(article.text)
+        bisect.insort(self._keys, key)
+        bisect.insort(self._keys_by_source.setdefault(article.source, []), key)
+        self._by_link.setdefault(normalize_url(article.link), article.id)
+        if fingerprint is None:
+            fingerprint = article_fingerprint(article)
+        if fingerprint is not None:
+            self._simhash.add(str(article.id), fingerprint)
+        self._search.add(str(article.id), article_fields(article))
+
+    def _unindex(self, article: Article) -> None:
+        key = sort_key(article)
+        self._bodies.pop(article.id, None)
+        for keys in (self._keys, self._keys_by_source[article.source]):
+            del keys[bisect.bisect_left(keys, key)]
+        link = normalize_url(article.link)
+        if self._by_link.get(link) == article.id:
+            del self._by_link[link]
+        self._simhash.remove(str(article.id))
+        self._search.remove(str(article.id))
+
+    def update(self, article: Article) -> None:
+        with self._lock:
+            self._unindex(self._articles[article.id].to_article(None))
+            self._index(article)
+            self._bump()
+
+    def _body(self, article_id: uuid.UUID, include_body: bool) -> str | None:
+        body = self._bodies.get(article_id) if include_body else None
+        return decompress_text(body) if body is not None else None
+
+    def _load(self, article_id: uuid.UUID, include_body: bool = True) -> Article:
+        return self._articles[article_id].to_article(self._body(article_id, include_body))
+
+    def _window(self, before: SortKey | None, limit: int, source: str | None) -> List[uuid.UUID]:
+        keys = self._keys if source is None else self._keys_by_source.get(source, [])
+        end = len(keys) if before is None else bisect.bisect_left(keys, before)
+        return [uuid.UUID(article_id) for _, article_id in reversed(keys[max(end - limit, 0):end])]
+
+    def get(self, article_id: uuid.UUID) -> Article | None:
+        # Reads take the lock too: update() unindexes and reindexes, briefly dropping the body and sort key
+        with self._lock:
+            return self._load(article_id) if article_id in self._articles else None
+
+    def exists(self, article_id: uuid.UUID) -> bool:
+        return article_id in self._articles
+
+    def find_by_link(self, normalized_link: str) -> Article | None:
+        with self._lock:
+            article_id = self._by_link.get(normalized_link)
+            return self._load(article_id) if article_id else None
+
+    def find_similar(self, fingerprint: int, max_distance: int) -> List[Article]:
+        # SimHashIndex is not thread-safe; every change to it happens under this lock too
+        with self._lock:
+            return [self._load(uuid.UUID(key)) for _, key in self._simhash.find(fingerprint, max_distance)]
+
+    def search(self, query: str, limit: int) -> List[Tuple[Article, float]]:
+        # Under the store lock, so an update can't drop a hit's body between ranking and loading
+        with self._lock:
+            return [(self._load(uuid.UUID(key)), score) for key, score in self._search.search(query, limit)]
+
+    def page(
+        self, before: SortKey | None, limit: int, source: str | None = None, include_body: bool = True,
+    ) -> List[Article]:
+        with self._lock:
+            return [self._load(article_id, include_body) for article_id in self._window(before, limit, source)]
+
+    def get_record(self, article_id: uuid.UUID) -> Dict[str, Any] | None:
+        with self._lock:
+            record = self._articles.get(article_id)
+            return record.to_record(self._body(article_id, True)) if record else None
+
+    def page_records(
+        self, before: SortKey | None, limit: int, source: str | None = None, include_body: bool = True,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                self._articles[article_id].to_record(self._body(article_id, include_body))
+                for article_id in self._window(before, limit, source)
+            ]
+
+    def save_analysis(
+        self, article_id: uuid.UUID, status: AnalysisStatus, result: dict | None = None, error: str | None = None,
+    ) -> None:
+        with self._lock:
+            record = self._articles.get(article_id)
+            if record is None:
+                return
+            record.analysis_status = status
+            if result is not None:
+                record.bias = result.get("bias_overall")
+            self._analyses[article_id] = ArticleAnalysis(
+                article_id=article_id, status=status, result=result, error=error,
+                updated_at=datetime.now(timezone.utc),
+            )
+            self._bump()
+
+    def get_analysis(self, article_id: uuid.UUID) -> ArticleAnalysis | None:
+        analysis = self._analyses.get(article_id)
+        record = self._articles.get(article_id)
+        if analysis is None and record is not None and record.analysis_status is not None:
+            # Stored "pending" or "skipped" with the article; nothing has run yet
+            return ArticleAnalysis(article_id=article_id, status=record.analysis_status, updated_at=record.created_at)
+        return analysis
+
+    def pending_analysis(self) -> List[Article]:
+        with self._lock:
+            pending = [article_id for article_id, record in self._articles.items() if record.analysis_status == "pending"]
+            return sorted((self._load(article_id) for article_id in pending), key=lambda article: article.created_at)
+
+    def count(self) -> int:
+        return len(self._articles)
+
+    def version(self) -> Tuple[int, datetime | None]:
+        return self._version, self._modified_at
+
+
+# FTS5 keeps the inverted index; bm25() weights follow FIELD_WEIGHTS column order
+FTS_FIELDS = tuple(FIELD_WEIGHTS)
+
+# Computed from other columns on write and never returned: normalized link and SimHash (+ its bands) for dedup
+BAND_COLUMNS = tuple(f"simhash_band{i}" for i in range(SIMHASH_BANDS))
+DERIVED_COLUMNS = ("link_norm", "simhash", *BAND_COLUMNS)
+BAND_COLUMN_DEFS = ",\n".join(f"    {name} INTEGER" for name in BAND_COLUMNS)
+BAND_INDEXES = "\n".join(f"CREATE INDEX IF NOT EXISTS idx_articles_{name} ON articles ({name});" for name in BAND_COLUMNS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL,
+    source TEXT NOT NULL,
+    authors TEXT,
+    summary TEXT,
+    top_image_url TEXT,
+    keywords TEXT,
+    published_at TEXT,
+    published_ts REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    bias TEXT,
+    analysis_status TEXT,
+    link_norm TEXT,
+    simhash INTEGER,
+{BAND_COLUMN_DEFS}
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_ts, id);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source, published_ts, id);
+CREATE INDEX IF NOT EXISTS idx_articles_link ON articles (link);
+CREATE INDEX IF NOT EXISTS idx_articles_link_norm ON articles (link_norm);
+{BAND_INDEXES}
+-- Bodies live out of line (zlib-compressed) so listings never page them in
+CREATE TABLE IF NOT EXISTS article_bodies (
+    id TEXT PRIMARY KEY,
+    text BLOB NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    id UNINDEXED, {", ".join(FTS_FIELDS)}, tokenize = 'unicode61'
+);
+CREATE TABLE IF NOT EXISTS article_analysis (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS store_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    modified_at TEXT
+);
+"""
+
+COLUMNS = (
+    "id", "title", "link", "source", "authors", "summary",
+    "top_image_url", "keywords", "published_at", "published_ts", "created_at",
+    "bias", "analysis_status", *DERIVED_COLUMNS,
+)
+
+BUSY_TIMEOUT_S = 30
+
+SELECT_WITH_BODY = "SELECT articles.*, article_bodies.text AS body FROM articles LEFT JOIN article_bodies USING (id)"
+
+
+class SQLiteArticleRepository(ArticleRepository):
+    """SQLite store in WAL mode so readers never block the writer."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            # Seeded from the clock so a recreated database never reissues an old ETag
+            conn.execute(
+                "INSERT OR IGNORE INTO store_version (id, version) VALUES (1, ?)", (time.time_ns() // 1000,)
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; FastAPI runs sync handlers on a thread pool
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Writers queue on SQLite's lock; wait well past the 5s default before failing a request
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _derived(article: Article, fingerprint: int | None = None) -> tuple:
+        if fingerprint is None:
+            fingerprint = article_fingerprint(article)
+        if fingerprint is None:
+            return (normalize_url(article.link), None, *([None] * SIMHASH_BANDS))
+        return (normalize_url(article.link), to_signed(fingerprint), *bands(fingerprint))
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection) -> None:
+        # Runs inside the write transaction, so other processes see the new version atomically
+        conn.execute(
+            "UPDATE store_version SET version = version + 1, modified_at = ? WHERE id = 1",
+            (datetime.now(timezone.utc).isoformat(),),
+        )
+
+    @staticmethod
+    def _fts_row(article: Article) -> tuple:
+        fields = article_fields(article)
+        return (str(article.id), *(fields[field] for field in FTS_FIELDS))
+
+    @staticmethod
+    def _index_text(conn: sqlite3.Connection, fts_rows: List[tuple], replace: bool = False) -> None:
+        if replace:
+            # id is UNINDEXED, so this scans the FTS table; only updates need it
+            conn.executemany("DELETE FROM articles_fts WHERE id = ?", [(row[0],) for row in fts_rows])
+        conn.executemany(
+            f"INSERT INTO articles_fts (id, {', '.join(FTS_FIELDS)}) VALUES (?{', ?' * len(FTS_FIELDS)})",
+            fts_rows,
+        )
+
+    @classmethod
+    def _to_row(cls, article: Article, fingerprint: int | None = None) -> tuple:
+        return (
+            str(article.id),
+            article.title,
+            article.link,
+            article.source,
+            json.dumps(article.authors) if article.authors is not None else None,
+            article.summary,
+            article.top_image_url,
+            json.dumps(article.keywords) if article.keywords is not None else None,
+            article.published_at.isoformat() if article.published_at else None,
+            sort_key(article)[0],
+            article.created_at.isoformat(),
+            article.bias,
+            article.analysis_status,
+            *cls._derived(article, fingerprint),
+        )
+
+    @staticmethod
+    def _row_data(row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        body = data.pop("body", None)
+        for name in ("published_ts", "score", *DERIVED_COLUMNS):
+            data.pop(name, None)
+        for field in ("authors", "keywords"):
+            if data.get(field) is not None:
+                data[field] = json.loads(data[field])
+        data["text"] = decompress_text(body) if body is not None else None
+        return data
+
+    @classmethod
+    def _from_row(cls, row: sqlite3.Row) -> Article:
+        return Article(**cls._row_data(row))
+
+    @classmethod
+    def _to_record(cls, row: sqlite3.Row) -> Dict[str, Any]:
+        # Columns were validated on insert and dates are stored as ISO strings already
+        data = cls._row_data(row)
+        data["published_at"] = json_datetime(data["published_at"])
+        data["created_at"] = json_datetime(data["created_at"])
+        return {field: data.get(field) for field in Article.model_fields}
+
+    def add(self, article: Article) -> None:
+        self.add_many([article])
+
+    def add_many(self, articles: List[Article]) -> None:
+        # Fingerprints, compression and FTS fields are computed before the write lock is taken,
+        # so concurrent writers only wait on the inserts themselves
+        prepared = [self._prepare(article) for article in articles]
+        with self._connection() as conn:
+            self._insert(conn, prepared)
+            self._bump(conn)
+
+    def add_unique(self, articles: List[Article]) -> List[Article | None]:
+        fingerprints = [article_fingerprint(article) for article in articles]
+        prepared = [self._prepare(article, fingerprint) for article, fingerprint in zip(articles, fingerprints)]
+        duplicates: List[Article | None] = []
+        with self._connection() as conn:
+            # Take the write lock before looking, so no other writer (or process) can store a copy in between.
+            # Not a UNIQUE index on link_norm: with DEDUP_POLICY=off repeated links are stored as they come.
+            conn.execute("BEGIN IMMEDIATE")
+            for article, fingerprint, row in zip(articles, fingerprints, prepared):
+                # Same connection, so earlier articles of this call are already visible
+                duplicate = find_duplicate(self, article, fingerprint=fingerprint)
+                if duplicate is None:
+                    self._insert(conn, [row])
+                duplicates.append(duplicate)
+            if None in duplicates:
+                self._bump(conn)
+        return duplicates
+
+    @classmethod
+    def _prepare(cls, article: Article, fingerprint: int | None = None) -> tuple:
+        body = compress_text(article.text) if article.text is not None else None
+        return cls._to_row(article, fingerprint), body, cls._fts_row(article)
+
+    def _insert(self, conn: sqlite3.Connection, prepared: List[tuple]) -> None:
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        conn.executemany(
+            f"INSERT INTO articles ({', '.join(COLUMNS)}) VALUES ({placeholders})", [row for row, _, _ in prepared]
+        )
+        conn.executemany(
+            "INSERT INTO article_bodies (id, text) VALUES (?, ?)",
+            [(row[0], body) for row, body, _ in prepared if body is not None],
+        )
+        self._index_text(conn, [fts_row for _, _, fts_row in prepared])
+
+    def update(self, article: Article) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in COLUMNS[1:])
+        row = self._to_row(article)
+        body = compress_text(article.text) if article.text is not None else None
+        fts_row = self._fts_row(article)
+        with self._connection() as conn:
+            conn.execute(f"UPDATE articles SET {assignments} WHERE id = ?", (*row[1:], row[0]))
+            if body is None:
+                conn.execute("DELETE FROM article_bodies WHERE id = ?", (row[0],))
+            else:
+                conn.execute("INSERT OR REPLACE INTO article_bodies (id, text) VALUES (?, ?)", (row[0], body))
+            self._index_text(conn, [fts_row], replace=True)
+            self._bump(conn)
+
+    def _get_row(self, article_id: uuid.UUID) -> sqlite3.Row | None:
+        return self._connection().execute(
+            f"{SELECT_WITH_BODY} WHERE articles.id = ?", (str(article_id),)
+        ).fetchone()
+
+    def get(self, article_id: uuid.UUID) -> Article | None:
+        row = self._get_row(article_id)
+        return self._from_row(row) if row else None
+
+    def exists(self, article_id: uuid.UUID) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM articles WHERE id = ?", (str(article_id),)
+        ).fetchone() is not None
+
+    def get_record(self, article_id: uuid.UUID) -> Dict[str, Any] | None:
+        row = self._get_row(article_id)
+        return self._to_record(row) if row else None
+
+    def find_by_link(self, normalized_link: str) -> Article | None:
+        row = self._connection().execute(
+            f"{SELECT_WITH_BODY} WHERE link_norm = ? ORDER BY created_at LIMIT 1", (normalized_link,)
+        ).fetchone()
+        return self._from_row(row) if row else None
+
+    def find_similar(self, fingerprint: int, max_distance: int) -> List[Article]:
+        # Each band column is indexed, so candidates come from SIMHASH_BANDS index lookups
+        where = " OR ".join(f"simhash_band{i} = ?" for i in range(SIMHASH_BANDS))
+        rows = self._connection().execute(
+            f"SELECT id, simhash FROM articles WHERE {where}", bands(fingerprint)
+        ).fetchall()
+        matches = sorted(
+            (distance, row["id"])
+            for row in rows
+            if (distance := hamming(to_unsigned(row["simhash"]), fingerprint)) <= max_distance
+        )
+        return [self.get(uuid.UUID(article_id)) for _, article_id in matches]
+
+    def search(self, query: str, limit: int) -> List[Tuple[Article, float]]:
+        # Quote every term so user input can't inject FTS5 query syntax
+        terms = " OR ".join(f'"{term}"' for term in set(tokenize(query)))
+        if not terms:
+            return []
+        weights = ", ".join(str(FIELD_WEIGHTS[field]) for field in FTS_FIELDS)
+        rows = self._connection().execute(
+            f"""
+            SELECT articles.*, article_bodies.text AS body, -bm25(articles_fts, 0, {weights}) AS score
+            FROM articles_fts
+            JOIN articles ON articles.id = articles_fts.id
+            LEFT JOIN article_bodies ON article_bodies.id = articles_fts.id
+            WHERE articles_fts MATCH ?
+            ORDER BY bm25(articles_fts, 0, {weights})
+            LIMIT ?
+            """,
+            (terms, limit),
+        ).fetchall()
+        return [(self._from_row(row), row["score"]) for row in rows]
+
+    def page(
+        self, before: SortKey | None, limit: int, source: str | None = None, include_body: bool = True,
+    ) -> List[Article]:
+        return [self._from_row(row) for row in self._page_rows(before, limit, source, include_body)]
+
+    def page_records(
+        self, before: SortKey | None, limit: int, source: str | None = None, include_body: bool = True,
+    ) -> List[Dict[str, Any]]:
+        return [self._to_record(row) for row in self._page_rows(before, limit, source, include_body)]
+
+    def _page_rows(
+        self, before: SortKey | None, limit: int, source: str | None, include_body: bool,
+    ) -> List[sqlite3.Row]:
+        clauses, params = [], []
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source)
+        if before is not None:
+            clauses.append("(published_ts, articles.id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        select = SELECT_WITH_BODY if include_body else "SELECT articles.* FROM articles"
+        return self._connection().execute(
+            f"{select} {where} ORDER BY published_ts DESC, articles.id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+
+    def save_analysis(
+        self, article_id: uuid.UUID, status: AnalysisStatus, result: dict | None = None, error: str | None = None,
+    ) -> None:
+        with self._connection() as conn:
+            if result is not None:
+                conn.execute(
+                    "UPDATE articles SET analysis_status = ?, bias = ? WHERE id = ?",
+                    (status, result.get("bias_overall"), str(article_id)),
+                )
+            else:
+                conn.execute("UPDATE articles SET analysis_status = ? WHERE id = ?", (status, str(article_id)))
+            conn.execute(
+                "INSERT OR REPLACE INTO article_analysis (id, status, result, error, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    str(article_id), status, json.dumps(result) if result is not None else None, error,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+            self._bump(conn)
+
+    def get_analysis(self, article_id: uuid.UUID) -> ArticleAnalysis | None:
+        row = self._connection().execute(
+            "SELECT article_analysis.*, articles.analysis_status, articles.created_at"
+            " FROM articles LEFT JOIN article_analysis USING (id) WHERE articles.id = ?",
+            (str(article_id),),
+        ).fetchone()
+        if row is None or (row["status"] is None and row["analysis_status"] is None):
+            return None
+        if row["status"] is None:
+            # Stored "pending" or "skipped" with the article; nothing has run yet
+            return ArticleAnalysis(
+                article_id=article_id, status=row["analysis_status"], updated_at=datetime.fromisoformat(row["created_at"]),
+            )
+        return ArticleAnalysis(
+            article_id=row["id"],
+            status=row["status"],
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+            error=row["error"],
+            updated_at=datetime.fromisoformat(row["updated_at"]),
+        )
+
+    def pending_analysis(self) -> List[Article]:
+        rows = self._connection().execute(
+            f"{SELECT_WITH_BODY} WHERE analysis_status = 'pending' ORDER BY created_at"
+        ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def version(self) -> Tuple[int, datetime | None]:
+        row = self._connection().execute("SELECT version, modified_at FROM store_version").fetchone()
+        return row["version"], datetime.fromisoformat(row["modified_at"]) if row["modified_at"] else None
+
+
+def create_repository() -> ArticleRepository:
+    """Builds the store selected by ARTICLE_STORE ("sqlite" or "memory")."""
+    backend = os.getenv("ARTICLE_STORE", "sqlite").lower()
+    if backend == "memory":
+        return MemoryArticleRepository()
+    if backend == "sqlite":
+        return SQLiteArticleRepository(os.getenv("ARTICLE_DB_PATH", "articles.db"))
+    raise ValueError(f"Unknown ARTICLE_STORE: {backend}")